@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+
+#   benchmarks.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   Benchmarks for the game. Run from the src directory:
+#       python benchmarks.py indexes [playerCount] [boardSize]
+#           Times the board indexes against a scan of the pixels of the
+#           board, with a skewed mix of player sizes
+#       python benchmarks.py memory [foodCount]
+#           Measures the bytes used by each food item
+#       python benchmarks.py pool [foodCount]
+#           Times creating food against reusing eaten food from a pool
+#       python benchmarks.py scheduler [aiCount] [seconds]
+#           Runs the decisions of random AIs on schedulers with different
+#           numbers of workers, to tune the DecisionScheduler
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from random import Random
+from indexes import SpatialHash, LooseQuadtree
+from pools import UserPool
+from schedulers import DecisionScheduler
+from streams import RandomStreams, ChoiceStream
+from decisions import AIRandomInput
+from users import Food, AIRandom
+
+## (radius, share of players). Most players are food, a few grew huge
+SKEWED_RADII = ((5, .90), (15, .05), (25, .03), (100, .015), (400, .005))
+
+## Number of timed queries of each kind
+QUERY_COUNT = 200
+
+###############################################################################
+##
+##                              PixelScan class
+##
+###############################################################################
+class PixelScan(object):
+    """The way collisions were found before boards had an index. Every
+    center is written on a board of pixels, and a query visits every
+    pixel within the radius.
+
+    Attributes:
+        players: Board containing the id of the player centered at
+            each position
+        entries: Map of userID to its center
+    """
+
+    def __init__(self, width, height):
+        self.__players  = [[None for c in range(width + 1)]
+                                for r in range(height + 1)]
+        self.__entries  = dict()
+
+    def insert(self, userID, centerPosition, radius):
+        (col, row) = centerPosition
+        self.__players[row][col] = userID
+        self.__entries[userID] = centerPosition
+
+    def move(self, userID, centerPosition, radius):
+        (col, row) = self.__entries[userID]
+        self.__players[row][col] = None
+        self.insert(userID, centerPosition, radius)
+
+    def queryRadius(self, centerPosition, radius):
+        """ Get the ids of players centered within the bounding box of
+            a circle
+        """
+        (centerCol, centerRow) = centerPosition
+        height = len(self.__players)
+        width = len(self.__players[0])
+        found = []
+        for row in range(max(0, centerRow - radius),
+                         min(height, centerRow + radius)):
+            line = self.__players[row]
+            for col in range(max(0, centerCol - radius),
+                             min(width, centerCol + radius)):
+                if line[col] is not None:
+                    found.append(line[col])
+        return found
+
+
+def createPlayers(count, size, radii = SKEWED_RADII, seed = 0):
+    """ Create (userID, center, radius) for count random players """
+    random = Random(seed)
+    sizes = [radius for (radius, share) in radii]
+    weights = [share for (radius, share) in radii]
+    players = []
+    for userID in range(count):
+        radius = random.choices(sizes, weights)[0]
+        center = (random.randint(0, size), random.randint(0, size))
+        players.append((userID, center, radius))
+    return players
+
+def createQueries(count, size, radii = SKEWED_RADII, seed = 1):
+    """ Create (center, radius) for count random queries """
+    return [(center, radius) for (userID, center, radius)
+                in createPlayers(count, size, radii, seed)]
+
+def timeIndex(index, players, queries, size):
+    """ Get the microseconds per insert, move and query of an index """
+    timings = dict()
+
+    start = time.time()
+    for (userID, center, radius) in players:
+        index.insert(userID, center, radius)
+    timings["insert"] = (time.time() - start) / len(players)
+
+    start = time.time()
+    for (userID, (col, row), radius) in players:
+        index.move(userID, (min(col + 1, size), row), radius)
+    timings["move"] = (time.time() - start) / len(players)
+
+    for query in ("queryRadius", "queryOverlapping"):
+        if not hasattr(index, query):
+            continue
+        start = time.time()
+        for (center, radius) in queries:
+            getattr(index, query)(center, radius)
+        timings[query] = (time.time() - start) / len(queries)
+
+    return dict((name, 1e6 * seconds) for (name, seconds) in timings.items())
+
+def measureFood(count):
+    """ Get the bytes allocated per food item, for count items """
+    gc.collect()
+    tracemalloc.start()
+    food = [Food("food_" + str(f), (f % 700, f // 700))
+                for f in range(count)]
+    (allocated, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(allocated) / len(food)
+
+def benchmarkMemory(argv):
+    foodCount = int(argv[0]) if len(argv) > 0 else 100000
+    print("%d food items: %.0f bytes each" % 
+            (foodCount, measureFood(foodCount)))
+
+def timeFoodChurn(count, userPool):
+    """ Get the microseconds to eat and respawn a food item, reusing
+        eaten food if a pool is given
+    """
+    food = [Food("food_" + str(f), (f % 700, f // 700))
+                for f in range(count)]
+    start = time.time()
+    for f in range(count):
+        eaten = food[f]
+        eaten.quit()
+        if userPool is not None:
+            userPool.release(eaten)
+            food[f] = userPool.acquire(Food, "new_food_" + str(f), (f, f))
+        else:
+            food[f] = Food("new_food_" + str(f), (f, f))
+    return 1e6 * (time.time() - start) / count
+
+def benchmarkPool(argv):
+    foodCount = int(argv[0]) if len(argv) > 0 else 100000
+    print("%d food items eaten and respawned (microseconds each)" % 
+            foodCount)
+    print("%-14s%10.2f" % ("new", timeFoodChurn(foodCount, None)))
+    print("%-14s%10.2f" % ("UserPool", 
+                            timeFoodChurn(foodCount, UserPool())))
+
+def timeScheduler(users, workerCount, seconds):
+    """ Get the decisions per second and the average milliseconds a
+        decision was late, on a scheduler with workerCount workers
+    """
+    scheduler = DecisionScheduler(workerCount)
+    for user in users:
+        scheduler.schedule(user, None)
+    scheduler.start()
+    time.sleep(seconds)
+    scheduler.stop()
+    return (scheduler.getDecisionCount() / seconds,
+            1e3 * scheduler.getAverageLateness())
+
+def benchmarkScheduler(argv):
+    aiCount = int(argv[0]) if len(argv) > 0 else 6000
+    seconds = float(argv[1]) if len(argv) > 1 else 2.
+    streams = RandomStreams(0)
+    users = [AIRandom("random_ai_" + str(a), (a % 700, a // 700),
+                      AIRandomInput(ChoiceStream(
+                                        len(AIRandomInput.DIRECTIONS),
+                                        streams.spawnGenerator())))
+                for a in range(aiCount)]
+    cores = os.cpu_count() or 1
+
+    print("%d random AIs on %d cores, %.1f decisions per second due" %
+            (aiCount, cores, aiCount / users[0].getDecisionInterval()))
+    print("%-14s%18s%18s" % ("workers", "decisions/s", "late (ms)"))
+    workerCount = 1
+    while workerCount <= max(2 * cores, 4):
+        (rate, lateness) = timeScheduler(users, workerCount, seconds)
+        print("%-14d%18.0f%18.2f" % (workerCount, rate, lateness))
+        workerCount *= 2
+
+def benchmarkIndexes(argv):
+    playerCount = int(argv[0]) if len(argv) > 0 else 20000
+    size = int(argv[1]) if len(argv) > 1 else 2000
+
+    players = createPlayers(playerCount, size)
+    queries = createQueries(QUERY_COUNT, size)
+    indexes = (
+        ("PixelScan",       PixelScan(size, size)),
+        ("SpatialHash",     SpatialHash()),
+        ("LooseQuadtree",   LooseQuadtree(size, size)))
+    columns = ("insert", "move", "queryRadius", "queryOverlapping")
+
+    print("%d players on a %dx%d board (microseconds per call)" %
+            (playerCount, size, size))
+    print("%-14s" % "" + "".join("%18s" % column for column in columns))
+    for (name, index) in indexes:
+        timings = timeIndex(index, players, queries, size)
+        print("%-14s" % name + "".join(
+                "%18.1f" % timings[column] if column in timings
+                    else "%18s" % "-"
+                for column in columns))
+
+def main(argv):
+    benchmarks = dict(
+                    indexes     = benchmarkIndexes, 
+                    memory      = benchmarkMemory,
+                    pool        = benchmarkPool,
+                    scheduler   = benchmarkScheduler)
+    name = argv[1] if len(argv) > 1 else "indexes"
+    if name not in benchmarks:
+        print("Choose a benchmark: %s" % ", ".join(sorted(benchmarks)))
+        return
+    benchmarks[name](argv[2:])
+
+
+if __name__ == '__main__':
+    main(sys.argv)
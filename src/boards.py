@@ -6,34 +6,55 @@
 #   Last Updated: December 9, 2016
 #
 #   List of board classes:
+#       GameBoard
 #       SyncGameBoard
+#       StripedGameBoard
+#       ChunkedGameBoard
 
+import abc
 import threading
-import pygame
 from enums import Color
+from indexes import SpatialHash
+from cameras import Camera
 
 ###############################################################################
 ##
-##                              SyncGameBoard class
+##                              GameBoard class
 ##
 ###############################################################################
-class SyncGameBoard(object):
-    """A thread-safe game board that works with pygame.
+class GameBoard(object, metaclass = abc.ABCMeta):
+    """A game board that works with pygame. Base class for all boards.
+
+    Subclasses decide how the center positions of players are stored
+    and how atomic access to a position is guaranteed. Every board keeps
+    an index of player positions that is used to find nearby players.
+    The board may be larger than the display, in which case the camera
+    decides which part of it is shown. Subclasses must provide the
+    abstract methods, or creating the board fails.
 
     Attributes:
         width: The width of the board
         height: The height of the board
-        players: Board containing the center postion of all active players
-        locks: Locks restricting atomic access to players board 
+        index: Spatial index of the center and radius of all players
+        camera: The part of the board shown on the display
+        version: Counter that changes whenever a player is placed, 
+            moved or removed
         display: pygame display
         background: pygame background
     """
 
-    def __init__(self, width = 700, height = 700):
+    def __init__(   self, 
+                    width       = 700, 
+                    height      = 700, 
+                    index       = None, 
+                    displaySize = None):
+        (displayWidth, displayHeight) = displaySize or (width, height)
         self.__width        = width
         self.__height       = height 
-        self.__players      = self.initGameBoardPlayers()  
-        self.__locks        = self.initGameBoardLocks()
+        self.__index        = index if index is not None else SpatialHash()
+        self.__camera       = Camera(displayWidth, displayHeight, 
+                                     width, height)
+        self.__version      = 0
         self.__display      = None
         self.__background   = None
 
@@ -41,6 +62,7 @@ class SyncGameBoard(object):
 
     def initialize(self):
         """ Initialize the gameboard """
+        self._initializePositions()
         self._initializeDisplay()
         self._initializeBackground()
         self._initializeTitle()
@@ -48,15 +70,23 @@ class SyncGameBoard(object):
         self.updateBackground()
         self.updateDisplay()
 
+    def _initializePositions(self):
+        """ Create the storage for player positions. Boards whose storage
+            is expensive build it here, so creating a board costs nothing
+        """
+        return
+
     def _initializeDisplay(self):
         """ Create the pygame display """
+        import pygame
         self.__display = pygame.display.set_mode(
-                            (self.__width, self.__height), 
+                            self.__camera.getDimensions(), 
                             pygame.FULLSCREEN,
                             32)
 
     def _initializeBackground(self):
         """ Create the background for the game """
+        import pygame
         background = pygame.Surface(self.__display.get_size())
         self.__background = background.convert()
         self.__background.fill(Color.WHITE)
@@ -66,6 +96,7 @@ class SyncGameBoard(object):
     #------------------------- END PAGE 1 --------------------------#
     def _initializeTitle(self):
         """ Initialize the title to the display """
+        import pygame
         titleFont = pygame.font.Font(None, 50)
         titleText = titleFont.render("TAG", 1, Color.BLACK)
         titleTextpos = titleText.get_rect(
@@ -77,16 +108,6 @@ class SyncGameBoard(object):
         self.__background.blit(titleText, titleTextpos)
         self.__background.blit(helpText, helpTextpos)
 
-    def initGameBoardLocks(self):
-        """ Initialize the board with a lock in each position """
-        return [[threading.Lock() for r in range(self.__width + 1)] 
-                    for c in range(self.__height + 1)]
-        
-    def initGameBoardPlayers(self):
-        """ This board holds the players center position. """
-        return [[None for r in range(self.__width + 1)] 
-                    for c in range(self.__height + 1)]
-
     ##########################   GETTERS   ##########################          
 
     def getDisplay(self):
@@ -104,7 +125,183 @@ class SyncGameBoard(object):
     def getHeight(self):
         return self.__height
 
+    def getIndex(self):
+        return self.__index
+
+    def getCamera(self):
+        return self.__camera
+
+    def getVersion(self):
+        return self.__version
+
+    def getPlayersNear(self, centerPosition, radius):
+        """ Get (userID, center, radius) of all players centered 
+            within radius of a position
+        """
+        return self.__index.queryRadius(centerPosition, radius)
+
+    def getNearestPlayers(  self, 
+                            centerPosition, 
+                            count       = 1, 
+                            maxDistance = None, 
+                            accept      = None):
+        """ Get (userID, center, radius) of the count players centered
+            nearest to a position, nearest first. accept(userID, center,
+            radius) filters the players (e.g. only smaller ones)
+        """
+        return self.__index.queryNearest(centerPosition, count, 
+                                         maxDistance, accept)
+
+    def getPlayersInView(self):
+        """ Get (userID, center, radius) of all players that may overlap
+            the viewport of the camera
+        """
+        (left, top, right, bottom) = self.__camera.getViewport()
+        reach = self.__index.getMaxRadius()
+        return self.__index.queryRect(left - reach, top - reach,
+                                      right + reach, bottom + reach)
+
+    @abc.abstractmethod
+    def getPlayerAtPosition(self, centerPosition):
+        """ Get the id of the player centered at a position (or None) """
+
+    @abc.abstractmethod
+    def isPositionOccupied(self, centerPosition):
+        """ Check whether a player is centered at a position """
+
+    def getAwake(self, cols, rows):
+        """ Get a mask of the positions (arrays of columns and rows) that
+            a moving player may reach, so players centered elsewhere 
+            can't collide. None if any position may be reached
+        """
+        return None
+
+    ##########################   SETTERS   ##########################
+
+    def updateDisplay(self, rects = None):
+        """ Show the display. Only update rects if given """
+        import pygame
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+    def updateBackground(self):
+        self.__display.blit(self.__background, (0, 0))
+
+    
+
+
+    #------------------------- END PAGE 2 --------------------------#
+    def placeUserOnBoard(self, centerPosition, userID, radius = 0, 
+                         isPassive = False):
+        """ Place a player on the board. 
+            Blocks until no other player is centered at that position.
+            Passive players (food) never move
+        """
+        self._occupyPosition(centerPosition, userID)
+        self.__index.insert(userID, centerPosition, radius)
+        self._touch()
+
+    def pullUserFromBoard(self, centerPosition):
+        """ Remove a player from its place on the board """
+        userID = self.getPlayerAtPosition(centerPosition)
+        if userID is not None:
+            self.__index.remove(userID)
+        self._vacatePosition(centerPosition)
+        self._touch()
+
+    def pullUserWithID(self, userID):
+        """ Remove a player from the board, found through the index. 
+            Used when the position of the player may be held by another
+            thread
+        """
+        entry = self.__index.getEntry(userID)
+        if entry is not None:
+            self.pullUserFromBoard(entry[0])
+
+    def moveUser(self, oldPosition, newPosition, user, setCenter = True):
+        """ Move a user from one place to another. A user whose center is
+            kept by someone else (see ShardedEngine) only moves on the 
+            board, with setCenter False
+        """
+        if setCenter:
+            user.setCenter(newPosition)
+        self._vacatePosition(oldPosition)
+        self._occupyPosition(newPosition, user.getID())
+        self.__index.move(user.getID(), newPosition, user.getRadius())
+        self._touch()
+
+    ########################   PROTECTED   ##########################
+
+    def _touch(self):
+        """ Record a change to the board. Two threads may race here and
+            lose an increment, but the version still changes
+        """
+        self.__version += 1
+
+    @abc.abstractmethod
+    def _occupyPosition(self, centerPosition, userID):
+        """ Mark a position as taken by a player. 
+            Blocks until no other player is centered at that position
+        """
+
+    @abc.abstractmethod
+    def _vacatePosition(self, centerPosition):
+        """ Mark a position as free """
+
+
+###############################################################################
+##
+##                              SyncGameBoard class
+##
+###############################################################################
+class SyncGameBoard(GameBoard):
+    """A thread-safe game board with a lock on every position.
+
+    Both boards hold a value for every pixel, so they are only built
+    when the board is initialized, or when a position is first used.
+
+    Attributes:
+        players: Board containing the center postion of all active players
+        locks: Locks restricting atomic access to players board 
+        initializeMutex: Ensures the boards are only built once
+    """
+
+    def __init__(   self, 
+                    width       = 700, 
+                    height      = 700, 
+                    index       = None, 
+                    displaySize = None):
+        GameBoard.__init__(self, width, height, index, displaySize)
+        self.__players          = None
+        self.__locks            = None
+        self.__initializeMutex  = threading.Lock()
+
+    #######################   INITIALIZERS   ########################
+
+    def _initializePositions(self):
+        """ Build the player and lock boards (once) """
+        with self.__initializeMutex:
+            if self.__locks is None:
+                self.__players  = self.initGameBoardPlayers()
+                self.__locks    = self.initGameBoardLocks()
+
+    def initGameBoardLocks(self):
+        """ Initialize the board with a lock in each position """
+        return [[threading.Lock() for r in range(self.getWidth() + 1)] 
+                    for c in range(self.getHeight() + 1)]
+        
+    def initGameBoardPlayers(self):
+        """ This board holds the players center position. """
+        return [[None for r in range(self.getWidth() + 1)] 
+                    for c in range(self.getHeight() + 1)]
+
+    ##########################   GETTERS   ##########################
+
     def getLockAtPosition(self, centerPosition):
+        if self.__locks is None:
+            self._initializePositions()
         try:
             (col, row) = centerPosition
             return self.__locks[row][col]
@@ -115,47 +312,219 @@ class SyncGameBoard(object):
             pass
 
     def getPlayerAtPosition(self, centerPosition):
+        if self.__players is None:
+            self._initializePositions()
         (col, row) = centerPosition
         return self.__players[row][col]
 
-    ##########################   SETTERS   ##########################
-
-    def updateDisplay(self):
-        pygame.display.flip()
-
-    def updateBackground(self):
-        self.__display.blit(self.__background, (0, 0))
-
-    
+    def isPositionOccupied(self, centerPosition):
+        return self.getLockAtPosition(centerPosition).locked()
 
+    ########################   PROTECTED   ##########################
 
-    #------------------------- END PAGE 2 --------------------------#
-    def updateTimeClock(self, timeRemaining):
-        """ Update the time that is visible to the user """
-        timeFont = pygame.font.Font(None, 36)
-        timeText = timeFont.render(str(timeRemaining), 1, Color.RED)
-        timeTextpos = timeText.get_rect(left = 30)
-        self.__display.blit(timeText, timeTextpos)
-
-    def placeUserOnBoard(self, centerPosition, userID):
-        """ Place a player on the board """
+    def _occupyPosition(self, centerPosition, userID):
         self.getLockAtPosition(centerPosition).acquire()
         self._setPlayerAtPosition(centerPosition, userID)
 
-    def pullUserFromBoard(self, centerPosition):
-        """ Remove a player from its place on the board """
+    def _vacatePosition(self, centerPosition):
         self._setPlayerAtPosition(centerPosition, None)
         self.getLockAtPosition(centerPosition).release()
 
-    def moveUser(self, oldPosition, newPosition, user):
-        """ Move a user from one place to another """
-        user.setCenter(newPosition)
-        self.pullUserFromBoard(oldPosition)
-        self.placeUserOnBoard(newPosition, user.getID())
+    def _setPlayerAtPosition(self, centerPosition, userID):
+        """ Set a user id on the player board at a position """
+        (col, row) = centerPosition
+        self.__players[row][col] = userID
+
+
+###############################################################################
+##
+##                              StripedGameBoard class
+##
+###############################################################################
+class StripedGameBoard(GameBoard):
+    """A thread-safe game board that only tracks occupied positions.
+
+    Occupied center positions are kept in hash maps that are split into a
+    fixed number of stripes. Each stripe is guarded by its own condition,
+    so memory grows with the number of players instead of the board area,
+    and players on different stripes never contend for the same lock.
+
+    Attributes:
+        stripeCount: The number of lock stripes
+        stripes: Conditions restricting atomic access to each stripe
+        players: Maps of occupied center position to player id (per stripe)
+    """
+
+    def __init__(   self, 
+                    width       = 700, 
+                    height      = 700, 
+                    stripeCount = 64, 
+                    index       = None, 
+                    displaySize = None):
+        GameBoard.__init__(self, width, height, index, displaySize)
+        self.__stripeCount  = stripeCount
+        self.__stripes      = [threading.Condition() 
+                                    for s in range(stripeCount)]
+        self.__players      = [dict() for s in range(stripeCount)]
+
+    ##########################   GETTERS   ##########################
+
+    def getPlayerAtPosition(self, centerPosition):
+        stripe = self._getStripeIndex(centerPosition)
+        return self.__players[stripe].get(tuple(centerPosition))
+
+    def isPositionOccupied(self, centerPosition):
+        stripe = self._getStripeIndex(centerPosition)
+        return tuple(centerPosition) in self.__players[stripe]
+
+    def getPlayerCount(self):
+        return sum(len(players) for players in self.__players)
 
     ########################   PROTECTED   ##########################
 
-    def _setPlayerAtPosition(self, centerPosition, userID):
-        """ Set a user id on the player board at a position """
+    def _occupyPosition(self, centerPosition, userID):
+        position = tuple(centerPosition)
+        stripe = self._getStripeIndex(position)
+        players = self.__players[stripe]
+
+        with self.__stripes[stripe]:
+            while position in players:
+                self.__stripes[stripe].wait()
+            players[position] = userID
+
+    def _vacatePosition(self, centerPosition):
+        position = tuple(centerPosition)
+        stripe = self._getStripeIndex(position)
+
+        with self.__stripes[stripe]:
+            self.__players[stripe].pop(position, None)
+            self.__stripes[stripe].notify_all()
+
+    def _getStripeIndex(self, centerPosition):
+        """ Stripe that guards a center position """
+        (col, row) = centerPosition
+        return (col * 7919 + row) % self.__stripeCount
+
+###############################################################################
+##
+##                              ChunkedGameBoard class
+##
+###############################################################################
+class ChunkedGameBoard(StripedGameBoard):
+    """A StripedGameBoard whose stripes are square chunks of the board.
+
+    Each chunk owns the occupied positions inside it and the condition
+    guarding them. A chunk also counts the moving players whose circle
+    may reach into it (found from the bounds of the circle when they
+    move). A chunk without any is asleep: the players centered in it
+    never move (food), and nothing can reach them, so no collision can
+    happen there. The VectorTickEngine leaves the blobs of asleep chunks
+    out of its collision pass, so large boards of mostly food cost next
+    to nothing per tick. The other engines find collisions from each
+    mover through the index, which never looks at far away food anyway.
+
+    Attributes:
+        chunkSize: The width and height of a chunk
+        chunkRows: The number of chunks in a column of the board
+        moverCounts: Number of moving players reaching into each chunk
+        moverBounds: Map of the userID of each moving player to the 
+            (firstCol, firstRow, lastCol, lastRow) of the chunks it 
+            reaches into
+        moverMutex: Controls atomic access to moverCounts and moverBounds
+    """
+
+    def __init__(   self, 
+                    width       = 700, 
+                    height      = 700, 
+                    chunkSize   = 64, 
+                    index       = None, 
+                    displaySize = None):
+        self.__chunkSize    = chunkSize
+        self.__chunkRows    = height // chunkSize + 1
+        chunkCount          = (width // chunkSize + 1) * self.__chunkRows
+        StripedGameBoard.__init__(self, width, height, chunkCount, 
+                                  index, displaySize)
+        self.__moverCounts  = [0] * chunkCount
+        self.__moverBounds  = dict()
+        self.__moverMutex   = threading.Lock()
+
+    ##########################   GETTERS   ##########################
+
+    def getChunkSize(self):
+        return self.__chunkSize
+
+    def isAsleep(self, centerPosition):
+        return not self.__moverCounts[self._getStripeIndex(centerPosition)]
+
+    def getAwake(self, cols, rows):
+        """ Positions in a chunk that a moving player reaches into """
+        import numpy
+        chunks = (cols // self.__chunkSize) * self.__chunkRows + \
+                 (rows // self.__chunkSize)
+        return numpy.asarray(self.__moverCounts)[chunks] > 0
+
+    def getAwakeChunkCount(self):
+        return sum(1 for count in self.__moverCounts if count)
+
+    ##########################   SETTERS   ##########################
+
+    def pullUserFromBoard(self, centerPosition):
+        userID = self.getPlayerAtPosition(centerPosition)
+        StripedGameBoard.pullUserFromBoard(self, centerPosition)
+        if userID is not None:
+            self._setMoverBounds(userID, None)
+
+    def placeUserOnBoard(self, centerPosition, userID, radius = 0, 
+                         isPassive = False):
+        StripedGameBoard.placeUserOnBoard(self, centerPosition, userID, 
+                                          radius, isPassive)
+        if not isPassive:
+            self._setMoverBounds(userID, 
+                                 self._getBounds(centerPosition, radius))
+
+    def moveUser(self, oldPosition, newPosition, user, setCenter = True):
+        StripedGameBoard.moveUser(self, oldPosition, newPosition, user, 
+                                  setCenter)
+        bounds = self._getBounds(newPosition, user.getRadius())
+        if self.__moverBounds.get(user.getID()) != bounds:
+            self._setMoverBounds(user.getID(), bounds)
+
+    ########################   PROTECTED   ##########################
+
+    def _getStripeIndex(self, centerPosition):
+        """ Chunk that holds a center position """
+        (col, row) = centerPosition
+        return (col // self.__chunkSize) * self.__chunkRows + \
+               (row // self.__chunkSize)
+
+    def _getBounds(self, centerPosition, radius):
+        """ Get the (firstCol, firstRow, lastCol, lastRow) of the chunks
+            a circle reaches into
+        """
         (col, row) = centerPosition
-        self.__players[row][col] = userID
\ No newline at end of file
+        size = self.__chunkSize
+        return (max(col - radius, 0) // size, max(row - radius, 0) // size,
+                min(col + radius, self.getWidth()) // size, 
+                min(row + radius, self.getHeight()) // size)
+
+    def _setMoverBounds(self, userID, bounds):
+        """ Change the chunks a moving player reaches into (None once it
+            leaves the board), waking the chunks it enters
+        """
+        with self.__moverMutex:
+            oldBounds = self.__moverBounds.pop(userID, None)
+            if oldBounds is not None:
+                self._countMover(oldBounds, -1)
+            if bounds is not None:
+                self._countMover(bounds, 1)
+                self.__moverBounds[userID] = bounds
+
+    def _countMover(self, bounds, change):
+        """ Add change to the count of every chunk in bounds. Must hold
+            moverMutex
+        """
+        (firstCol, firstRow, lastCol, lastRow) = bounds
+        for chunkCol in range(firstCol, lastCol + 1):
+            first = chunkCol * self.__chunkRows
+            for chunk in range(first + firstRow, first + lastRow + 1):
+                self.__moverCounts[chunk] += change
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+#   caches.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of cache classes:
+#       LRUCache
+
+import threading
+from collections import OrderedDict
+
+###############################################################################
+##
+##                              LRUCache class
+##
+###############################################################################
+class LRUCache(object):
+    """A thread-safe map that holds at most maxSize entries.
+
+    When it is full, adding an entry evicts the one that was used least
+    recently.
+
+    Attributes:
+        maxSize: The most entries held at once
+        entries: Map of key to value, from least to most recently used
+        hits: The number of lookups that found an entry
+        misses: The number of lookups that had to create an entry
+        mutex: Controls atomic access to the entries
+    """
+
+    def __init__(self, maxSize):
+        self.__maxSize  = maxSize
+        self.__entries  = OrderedDict()
+        self.__hits     = 0
+        self.__misses   = 0
+        self.__mutex    = threading.Lock()
+
+    ##########################   GETTERS   ##########################
+
+    def get(self, key, create):
+        """ Get the value for key. If it isn't cached, call create()
+            to make it and cache the result
+        """
+        with self.__mutex:
+            if key in self.__entries:
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return self.__entries[key]
+
+        value = create()
+
+        with self.__mutex:
+            self.__misses += 1
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__maxSize:
+                self.__entries.popitem(last = False)
+        return value
+
+    def getMaxSize(self):
+        return self.__maxSize
+
+    def getHits(self):
+        return self.__hits
+
+    def getMisses(self):
+        return self.__misses
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def __len__(self):
+        return len(self.__entries)
+
+    ##########################   SETTERS   ##########################
+
+    def clear(self):
+        with self.__mutex:
+            self.__entries.clear()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+#   cameras.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of camera classes:
+#       Camera
+
+###############################################################################
+##
+##                              Camera class
+##
+###############################################################################
+class Camera(object):
+    """The part of the board that is shown on the display.
+
+    The board may be larger than the display. The camera keeps the top
+    left corner of the visible part of the board (its offset) and converts
+    between board positions and screen positions. Following a player keeps
+    it in the middle of the screen without showing anything off the board.
+
+    Attributes:
+        width: The width of the viewport
+        height: The height of the viewport
+        boardWidth: The width of the board being shown
+        boardHeight: The height of the board being shown
+        offset: The board position drawn at the top left of the screen
+    """
+
+    def __init__(self, width, height, boardWidth, boardHeight):
+        self.__width        = width
+        self.__height       = height
+        self.__boardWidth   = boardWidth
+        self.__boardHeight  = boardHeight
+        self.__offset       = (0, 0)
+
+    ##########################   GETTERS   ##########################
+
+    def getDimensions(self):
+        return self.__width, self.__height
+
+    def getOffset(self):
+        return self.__offset
+
+    def getViewport(self):
+        """ Get the (left, top, right, bottom) of the visible board """
+        (left, top) = self.__offset
+        return left, top, left + self.__width, top + self.__height
+
+    def showsWholeBoard(self):
+        return self.__width >= self.__boardWidth and \
+               self.__height >= self.__boardHeight
+
+    def toScreen(self, boardPosition):
+        """ Convert a position on the board to a position on the screen """
+        (col, row) = boardPosition
+        (left, top) = self.__offset
+        return col - left, row - top
+
+    def toBoard(self, screenPosition):
+        """ Convert a position on the screen to a position on the board """
+        (col, row) = screenPosition
+        (left, top) = self.__offset
+        return col + left, row + top
+
+    ##########################   SETTERS   ##########################
+
+    def follow(self, centerPosition):
+        """ Center the viewport on a position, without leaving the board """
+        (col, row) = centerPosition
+        left = min(max(col - self.__width // 2, 0),
+                   max(self.__boardWidth - self.__width, 0))
+        top = min(max(row - self.__height // 2, 0),
+                  max(self.__boardHeight - self.__height, 0))
+        self.__offset = (left, top)
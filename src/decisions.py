@@ -11,12 +11,13 @@
 #       MouseInput
 #       AISmartInput
 #       AIRandomInput
+#       AIPursuitInput
+#       AIHunterInput
 
-import pygame
-from collections import defaultdict
-from random import randint
 from enums import Direction, Timeout
 
+## Hunters flee from larger players centered closer than this
+FLEE_DISTANCE = 150
 
 ###############################################################################
 ##
@@ -24,7 +25,40 @@ from enums import Direction, Timeout
 ##
 ###############################################################################
 class Basic(object):
-    """ Base class for all decision classes """
+    """ Base class for all decision classes. Decisions use slots, and 
+        only keep state that differs between instances
+
+    Attributes:
+        DECISION_INTERVAL: Seconds between decisions (None if it never 
+            needs to decide)
+        TURNS_TOWARDS: Map of tuples to turn methods
+            (colIsLarger, isPositive) is the pattern
+                Ex: (1,0) results in a left turn because that means that
+                the column difference is larger than the row difference and
+                the difference is negative. Therefore the position is to
+                the left
+    """
+
+    __slots__ = ()
+
+    DECISION_INTERVAL = None
+
+    def getDecisionInterval(self):
+        return self.DECISION_INTERVAL
+
+    def waitForDecision(self, user, game):
+        """ Make a decision at every interval until the user dies """
+        while not user.isDead().wait(timeout = self.getDecisionInterval()):
+            self.makeDecision(user, game)
+        self.stopDeciding(user, game)
+
+    def makeDecision(self, user, game):
+        """ Make a single decision """
+        return
+
+    def stopDeciding(self, user, game):
+        """ Called once after the user has died """
+        return
 
     def turnLeft(self, movement):
         movement.setCurrentDirection(Direction.LEFT)
@@ -42,6 +76,30 @@ class Basic(object):
         """ No turn associated with that decision """
         return
 
+    TURNS_TOWARDS = {
+        (1, 0)  : turnLeft,
+        (1, 1)  : turnRight,
+        (0, 0)  : turnUp,
+        (0, 1)  : turnDown
+    }
+
+    def turnTowards(self, movement, position, away = False):
+        """ Turn towards (or away from) a position, along the axis the
+            user is furthest from it on
+        """
+        (col, row) = movement.getCenter()
+        colDifference = position[0] - col
+        rowDifference = position[1] - row
+        if away:
+            (colDifference, rowDifference) = (-colDifference, -rowDifference)
+
+        colDifferenceLarger = (abs(colDifference)) > (abs(rowDifference))
+        if colDifferenceLarger:
+            turn = self.TURNS_TOWARDS[(1, colDifference > 0)]
+        else:
+            turn = self.TURNS_TOWARDS[(0, rowDifference > 0)]
+        return turn(self, movement)
+
     def quitGame(self, gameOverFlag):
         gameOverFlag.set()
 
@@ -54,6 +112,8 @@ class Basic(object):
 class Stationary(Basic):
     """ Decision class for a Stationary player """
 
+    __slots__ = ()
+
     def waitForDecision(self, user, game):
         """ DEFAULT: Wait for user to die 
             Theoretically you could just return, but it's more realistic to 
@@ -73,43 +133,55 @@ class KeyInput(Basic):
     """ Decision class for keyboard inputs
 
     Attributes:
-        directions: Map of key inputs to methods
+        directions: Map of key inputs to turn methods
     """
 
+    __slots__ = ("__directions",)
+
+    DECISION_INTERVAL = Timeout.DECISION
+
     def __init__(   self, 
-                    upKey       = pygame.K_UP, 
-                    downKey     = pygame.K_DOWN,
-                    leftKey     = pygame.K_LEFT, 
-                    rightKey    = pygame.K_RIGHT):
-
-        self.__directions   = defaultdict(
-            lambda: self.noTurn,
-            {
-                leftKey  : self.turnLeft,
-                rightKey : self.turnRight,
-                upKey    : self.turnUp,
-                downKey  : self.turnDown
+                    upKey       = None, 
+                    downKey     = None,
+                    leftKey     = None, 
+                    rightKey    = None):
+        """ Keys default to the arrow keys. They are looked up here, so
+            importing this module doesn't import pygame
+        """
+        import pygame
+        upKey       = pygame.K_UP if upKey is None else upKey
+        downKey     = pygame.K_DOWN if downKey is None else downKey
+        leftKey     = pygame.K_LEFT if leftKey is None else leftKey
+        rightKey    = pygame.K_RIGHT if rightKey is None else rightKey
+
+        self.__directions   = {
+                leftKey  : Basic.turnLeft,
+                rightKey : Basic.turnRight,
+                upKey    : Basic.turnUp,
+                downKey  : Basic.turnDown
             }
-        )
 
-    def waitForDecision(self, user, game):
-        """ Handle keyboard presses """
+    def makeDecision(self, user, game):
+        """ Handle the keyboard presses since the last decision """
+        import pygame
         gameOverFlag = game.getGameOverFlag()
-        while not user.isDead().wait(timeout = Timeout.DECISION):
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
-                        self.quitGame(gameOverFlag)
-                    else:
-                        self.turn(user.getMovement(), event.key)
-                elif event.type == pygame.QUIT:
+        for event in pygame.event.get():
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
                     self.quitGame(gameOverFlag)
+                else:
+                    self.turn(user.getMovement(), event.key)
+            elif event.type == pygame.QUIT:
+                self.quitGame(gameOverFlag)
 
-        self.quitGame(gameOverFlag)    
+    def stopDeciding(self, user, game):
+        """ The game is over once the human dies """
+        self.quitGame(game.getGameOverFlag())
 
     def turn(self, movement, keyPressed):
         """ Turn the user depending on the pressed key """
-        return self.__directions[keyPressed](movement)
+        turn = self.__directions.get(keyPressed, Basic.noTurn)
+        return turn(self, movement)
 
 
 ###############################################################################
@@ -118,57 +190,35 @@ class KeyInput(Basic):
 ##
 ###############################################################################
 class MouseInput(Basic):
-    """ Decision class for mouse input
+    """ Decision class for mouse input. The user turns towards the mouse """
 
-     Attributes:
-        directions: Map of tuples to decision methods
-            (colIsLarger, isPositive) is the pattern
-                Ex: (1,0) results in a left turn because that means that 
-                the column difference is larger than the row difference and
-                the difference is negative. Therefore the mouse is to the left
-    """
+    __slots__ = ()
 
+    DECISION_INTERVAL = Timeout.DECISION
 
     #------------------------- END PAGE 2 --------------------------#
-    def __init__(self):
-        self.__directions   = defaultdict(
-            lambda: self.noTurn,
-            {
-                (1, 0)  : self.turnLeft,
-                (1, 1)  : self.turnRight,
-                (0, 0)  : self.turnUp,
-                (0, 1)  : self.turnDown
-            }
-        )
-
-    def waitForDecision(self, user, game):
-        """ Handle mouse motion """
+    def makeDecision(self, user, game):
+        """ Handle the mouse motion since the last decision """
+        import pygame
         gameOverFlag = game.getGameOverFlag()
-        while not user.isDead().wait(timeout = Timeout.DECISION):
-            for event in pygame.event.get():
-                if event.type == pygame.MOUSEMOTION:
-                    self.turn(user.getMovement(), event.pos)
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_q:
-                        self.quitGame(gameOverFlag)
-                elif event.type == pygame.QUIT:
+        for event in pygame.event.get():
+            if event.type == pygame.MOUSEMOTION:
+                """ The mouse is on the screen, the user is on the board """
+                camera = game.getGameboard().getCamera()
+                self.turn(user.getMovement(), camera.toBoard(event.pos))
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q:
                     self.quitGame(gameOverFlag)
+            elif event.type == pygame.QUIT:
+                self.quitGame(gameOverFlag)
 
-        self.quitGame(gameOverFlag)
+    def stopDeciding(self, user, game):
+        """ The game is over once the human dies """
+        self.quitGame(game.getGameOverFlag())
 
     def turn(self, movement, mousePosition):
         """ Change the user direction based on the mouse position """
-        (col, row) = movement.getCenter()
-        (mouseCol, mouseRow) = mousePosition
-
-        colDifference = mouseCol - col
-        rowDifference = mouseRow - row
-
-        colDifferenceLarger = (abs(colDifference)) > (abs(rowDifference))
-        if colDifferenceLarger:
-            return self.__directions[(1, colDifference > 0)](movement)
-
-        return self.__directions[(0, rowDifference > 0)](movement)
+        return self.turnTowards(movement, mousePosition)
 
 
 ###############################################################################
@@ -177,16 +227,15 @@ class MouseInput(Basic):
 ##
 ###############################################################################
 class AISmartInput(Basic):
-    """ Decision class for AI that moves towards human 
-
-    Attributes:
-        directions: Map of tuples to decision methods
-            (colIsLarger, isPositive) is the pattern
-                Ex: (1,0) results in a left turn because that means that 
-                the column difference is larger than the row difference and
-                the difference is negative. Therefore the mouse is to the left
+    """ Decision class for AI that moves towards human. A scheduler that
+        reads the center of the human once for many smart AIs calls
+        turnTowards with it directly
     """ 
 
+    __slots__ = ()
+
+    DECISION_INTERVAL = Timeout.SLOWDECISION
+
     
 
 
@@ -196,37 +245,16 @@ class AISmartInput(Basic):
 
 
     #------------------------- END PAGE 3 --------------------------#
-    def __init__(self):
-        self.__directions   = defaultdict(
-            lambda: self.noTurn,
-            {
-                (1, 0)  : self.turnLeft,
-                (1, 1)  : self.turnRight,
-                (0, 0)  : self.turnUp,
-                (0, 1)  : self.turnDown
-            }
-        )
-
-    def waitForDecision(self, user, game):
-        while not user.isDead().wait(timeout = Timeout.SLOWDECISION):
-            self.turn(user.getMovement(), game)    
+    def makeDecision(self, user, game):
+        self.turn(user.getMovement(), game)
 
     def turn(self, movement, game):
-        (col, row) = movement.getCenter()
         try:
-            (humanCol, humanRow) = game.getHumanUser().getCenter() 
+            humanCenter = game.getHumanUser().getCenter() 
         except StopIteration:
             """ Human has been killed but not registered """
             return
-
-        colDifference = humanCol - col
-        rowDifference = humanRow - row
-
-        colDifferenceLarger = (abs(colDifference)) > (abs(rowDifference))
-        if colDifferenceLarger:
-            return self.__directions[(1, colDifference > 0)](movement)
-
-        return self.__directions[(0, rowDifference > 0)](movement)
+        return self.turnTowards(movement, humanCenter)
 
 
 ###############################################################################
@@ -235,26 +263,105 @@ class AISmartInput(Basic):
 ##
 ###############################################################################
 class AIRandomInput(Basic):
-    """ Decision class for AI to move randomly 
+    """ Decision class for AI to move randomly. Turns are read from a
+        ChoiceStream, so an AI given a seeded stream makes the same turns
+        every game. A ChoiceStream is not thread-safe, so every random AI
+        needs a decision (and a stream) of its own
 
     Attributes:
-        directions: Map of numbers to directions
+        DIRECTIONS: The turn methods to choose from
+        choices: The ChoiceStream the turns are read from
     """
-    def __init__(self):
-
-        self.__directions   = dict(
-            {
-                0 : self.noTurn,
-                1 : self.turnLeft,
-                2 : self.turnRight,
-                3 : self.turnUp,
-                4 : self.turnDown
-            }
-        )
 
-    def waitForDecision(self, user, game):
-        while not user.isDead().wait(timeout = Timeout.SLOWDECISION):
-            self.turn(user.getMovement())    
+    __slots__ = ("__choices",)
+
+    DECISION_INTERVAL = Timeout.SLOWDECISION
+
+    DIRECTIONS = (Basic.noTurn, Basic.turnLeft, Basic.turnRight,
+                  Basic.turnUp, Basic.turnDown)
+
+    def __init__(self, choices):
+        self.__choices = choices
+
+    def getChoices(self):
+        return self.__choices
+
+    def makeDecision(self, user, game):
+        self.turn(user.getMovement())
 
     def turn(self, movement):
-        return self.__directions[randint(0, 4)](movement)
\ No newline at end of file
+        return self.DIRECTIONS[self.__choices.next()](self, movement)
+
+
+###############################################################################
+##
+##                              AIPursuit class
+##
+###############################################################################
+class AIPursuitInput(AISmartInput):
+    """ Decision class for AI that follows a FlowField to the human, going
+        around larger blobs. Pursuers of a size share a field, so a 
+        decision is a lookup. In the cell of the human it heads straight
+        for it
+
+    Attributes:
+        flowField: The FlowField shared by the pursuers
+    """
+
+    __slots__ = ("__flowField",)
+
+    def __init__(self, flowField):
+        self.__flowField = flowField
+
+    def getFlowField(self):
+        return self.__flowField
+
+    def makeDecision(self, user, game):
+        movement = user.getMovement()
+        direction = self.__flowField.getDirection(game, 
+                                                  movement.getCenter(),
+                                                  movement.getRadius())
+        if direction is None:
+            self.turn(movement, game)
+        else:
+            movement.setCurrentDirection(direction)
+
+
+###############################################################################
+##
+##                              AIHunter class
+##
+###############################################################################
+class AIHunterInput(Basic):
+    """ Decision class for AI that hunts the nearest smaller player, and
+        flees from the nearest larger one when it comes close. Both are
+        found with a nearest query on the board index, so a decision 
+        doesn't look at every player
+    """
+
+    __slots__ = ()
+
+    DECISION_INTERVAL = Timeout.SLOWDECISION
+
+    def makeDecision(self, user, game):
+        movement = user.getMovement()
+        center = movement.getCenter()
+        radius = movement.getRadius()
+        gameboard = game.getGameboard()
+
+        def isThreat(otherID, otherCenter, otherRadius):
+            return otherRadius > radius
+
+        def isPrey(otherID, otherCenter, otherRadius):
+            return otherRadius < radius
+
+        threats = gameboard.getNearestPlayers(
+                        center, 
+                        maxDistance = FLEE_DISTANCE, 
+                        accept = isThreat)
+        if threats:
+            return self.turnTowards(movement, threats[0][1], away = True)
+
+        prey = gameboard.getNearestPlayers(center, accept = isPrey)
+        if prey:
+            return self.turnTowards(movement, prey[0][1])
@@ -0,0 +1,876 @@
+#!/usr/bin/env python
+
+#   engines.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of engine classes:
+#       ThreadedEngine
+#       TickEngine
+#       VectorTickEngine
+#       AsyncEngine
+#       ShardedEngine
+
+import os
+import threading
+import time
+from decisions import AISmartInput, AIRandomInput
+from enums import Timeout
+from movements import WorldCircle_
+
+## NumPy, asyncio, multiprocessing and the worlds and shards built on them
+## are imported by the engines that use them, so the default threaded
+## game is quick to import and never loads NumPy
+
+###############################################################################
+##
+##                              ThreadedEngine class
+##
+###############################################################################
+class ThreadedEngine(object):
+    """ Runs the decisions and movements of every user in its own threads.
+        This is the default engine. Given a DecisionScheduler, the AIs
+        only move in their own threads, and the scheduler makes all of
+        their decisions with a fixed number of threads.
+
+    Attributes:
+        decisionScheduler: Makes the decisions of the AIs (None to give
+            every AI a decision thread)
+    """
+
+    def __init__(self, decisionScheduler = None):
+        self.__decisionScheduler = decisionScheduler
+
+    def getDecisionScheduler(self):
+        return self.__decisionScheduler
+
+    def getGameTime(self):
+        """ Seconds of game time. Users run in real time, so this is the
+            wall clock
+        """
+        return time.time()
+
+    def runsGameClock(self):
+        """ The game runs its own clock and game over threads """
+        return False
+
+    ##########################   RUNNING   ##########################
+
+    def run(self, game):
+        """ Start every user and the food spawner. The human is started
+            last since it takes over the calling thread
+        """
+        foodSpawner = game.getFoodSpawner()
+        if foodSpawner is not None:
+            spawnerThread = threading.Thread(
+                                target = foodSpawner.run,
+                                args = [game])
+            spawnerThread.start()
+
+        if self.__decisionScheduler is not None:
+            self._runScheduled(game)
+            return
+
+        for user in game.getUsers():
+            user.start(game)
+
+    def userKilled(self, user, game):
+        """ The movement thread of a dead user takes it off the board 
+            as it exits. Passive users have no thread, and their eater
+            may hold their position, so they are pulled by id
+        """
+        if user.isPassive():
+            game.getGameboard().pullUserWithID(user.getID())
+            game.recycleUser(user)
+
+    #########################   PROTECTED   #########################
+
+    def _runScheduled(self, game):
+        """ Start the AIs with their decisions on the scheduler. The
+            human keeps its own decisions, which need the main thread
+        """
+        scheduler = self.__decisionScheduler
+        scheduler.start()
+
+        human = game.getHumanUser()
+        for user in game.getUsers():
+            if user is human or user.isPassive():
+                user.start(game)
+            else:
+                user.startMoving(game)
+                if user.getDecisionInterval() is not None:
+                    scheduler.schedule(user, game)
+
+        """ The human only returns once the game is over """
+        scheduler.stop()
+
+
+###############################################################################
+##
+##                              TickEngine class
+##
+###############################################################################
+class TickEngine(object):
+    """Advances every user from a single thread with a fixed timestep.
+
+    Each tick adds the tick length to a movement and a decision clock per
+    user. A user moves (or decides) once for every interval that fits in
+    its clock, so blobs keep the speed they have in the threaded engine
+    while no thread is created for them. Users are always visited in the
+    order they were added, so a game with seeded decisions is replayed
+    exactly when realTime is off. Passive users (food) are skipped.
+    Given a DetailScheduler, users far from the action decide less often.
+    They still move one pixel at a time, since a move here is where its
+    collisions are found. Only the VectorTickEngine moves them less often.
+
+    Attributes:
+        tickLength: Simulated seconds that pass on each tick
+        realTime: If set, ticks are paced to the wall clock
+        detailScheduler: Slows down distant users (or None)
+        movementClocks: Map of userID to time accumulated towards a move
+        decisionClocks: Map of userID to time accumulated towards a decision
+        killedUsers: Users that died and must still leave the board
+        tickCount: The number of ticks that have run
+    """
+
+    def __init__(   self,
+                    tickLength      = Timeout.TICK,
+                    realTime        = True,
+                    detailScheduler = None):
+        self.__tickLength       = tickLength
+        self.__realTime         = realTime
+        self.__detailScheduler  = detailScheduler
+        self.__movementClocks   = dict()
+        self.__decisionClocks   = dict()
+        self.__killedUsers      = []
+        self.__tickCount        = 0
+
+    ##########################   GETTERS   ##########################
+
+    def getTickLength(self):
+        return self.__tickLength
+
+    def getTickCount(self):
+        return self.__tickCount
+
+    def getGameTime(self):
+        """ Seconds of game time, counted in ticks. It doesn't depend on
+            the wall clock, so an unpaced game replays exactly
+        """
+        return self.__tickCount * self.__tickLength
+
+    def runsGameClock(self):
+        """ The game runs its own clock and game over threads """
+        return False
+
+    def getDetailScheduler(self):
+        return self.__detailScheduler
+
+    ##########################   RUNNING   ##########################
+
+    def run(self, game):
+        """ Run ticks in the calling thread until the game is over """
+        gameOverFlag = game.getGameOverFlag()
+        nextTick = time.time()
+
+        while not gameOverFlag.is_set():
+            self.step(game)
+
+            if self.__realTime:
+                nextTick += self.__tickLength
+                delay = nextTick - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -self.__tickLength:
+                    """ Too far behind. Drop the time instead of
+                        running a burst of ticks to catch up
+                    """
+                    nextTick = time.time()
+
+        self._retireKilledUsers(game)
+        for user in game.getUsers():
+            self._retireUser(user, game)
+
+    def step(self, game):
+        """ Advance every user (and the food spawner) by one tick """
+        foodSpawner = game.getFoodSpawner()
+        if foodSpawner is not None:
+            foodSpawner.spawn(game, self.__tickLength)
+        if self.__detailScheduler is not None:
+            self.__detailScheduler.update(game)
+
+        self._advance(game)
+        self.__tickCount += 1
+
+    def userKilled(self, user, game):
+        """ Queue a user that was eaten to leave the board. This is called
+            while the position of the user is held, so it can't leave yet
+        """
+        self.__killedUsers.append(user)
+
+    #########################   PROTECTED   #########################
+
+    def _advance(self, game):
+        """ Make the decisions and moves of every user that are due """
+        for user in game.getUsers():
+            if user.isDead().is_set() or user.isPassive():
+                continue
+            self._decide(user, game)
+            self._move(user, game)
+
+    def _retireKilledUsers(self, game):
+        """ Take every user that was eaten since the last call off
+            the board, so no one can collide with it anymore
+        """
+        while self.__killedUsers:
+            self._retireUser(self.__killedUsers.pop(), game)
+
+    def _decide(self, user, game):
+        """ Make every decision that is due this tick """
+        interval = user.getDecisionInterval()
+        if interval is None:
+            return
+
+        userID = user.getID()
+        clock = self.__decisionClocks.get(userID, 0) + self.__tickLength
+        if clock >= interval and self.__detailScheduler is not None:
+            """ Only find the slowdown once a decision may be due """
+            interval *= self.__detailScheduler.getSlowdown(user.getCenter())
+        while clock >= interval and not user.isDead().is_set():
+            clock -= interval
+            user.makeDecision(game)
+        self.__decisionClocks[userID] = clock
+
+    def _move(self, user, game):
+        """ Make every move that is due this tick """
+        userID = user.getID()
+        clock = self.__movementClocks.get(userID, 0) + self.__tickLength
+        interval = user.getMovementInterval()
+        while clock >= interval and not user.isDead().is_set():
+            clock -= interval
+            user.move(game)
+            self._retireKilledUsers(game)
+            """ The radius (and therefore speed) changes when eating """
+            interval = user.getMovementInterval()
+        self.__movementClocks[userID] = clock
+
+    def _retireUser(self, user, game):
+        """ Take a dead user off the board and forget its clocks """
+        self.__movementClocks.pop(user.getID(), None)
+        self.__decisionClocks.pop(user.getID(), None)
+        user.stopDeciding(game)
+        user.leaveBoard(game)
+        game.recycleUser(user)
+
+
+###############################################################################
+##
+##                              VectorTickEngine class
+##
+###############################################################################
+class VectorTickEngine(TickEngine):
+    """A TickEngine that keeps the state of every blob in a World.
+
+    When a user is first seen its movement is swapped for a WorldCircle_,
+    a thin view over its slot in the world. Decisions are still made per
+    user, except for smart AIs: the human is read once per decision 
+    interval and every smart AI is steered towards it in one vectorised
+    step. Every blob is moved in one vectorised pass per tick and the 
+    blobs that moved are synced to the board. All collisions are then
+    found in a single batch and settled in a fixed order, so the result
+    does not depend on the order the blobs moved in. Blobs the board
+    reports as asleep (see ChunkedGameBoard) are left out of it. Given a
+    DetailScheduler, distant blobs are also moved less often in longer
+    jumps, so they are synced to the board less often. Collisions are
+    found along the whole path a blob moved, so a jump can't skip over
+    a blob.
+
+    Attributes:
+        world: The World holding the state of every blob
+        slots: Map of userID to its slot in the world
+        movements: Map of userID to the movement a user had before it
+            was attached to the world
+        smartClock: Time accumulated towards the next decision of the
+            smart AIs
+        smartDecisionCount: The number of decisions of the smart AIs.
+            A smart AI with a slowdown of n takes one of every n
+    """
+
+    def __init__(   self,
+                    tickLength      = Timeout.TICK,
+                    realTime        = True,
+                    world           = None,
+                    detailScheduler = None):
+        TickEngine.__init__(self, tickLength, realTime, detailScheduler)
+        if world is None:
+            from worlds import World
+            world = World()
+        self.__world                = world
+        self.__slots                = dict()
+        self.__movements            = dict()
+        self.__smartClock           = 0.
+        self.__smartDecisionCount   = 0
+
+    ##########################   GETTERS   ##########################
+
+    def getWorld(self):
+        return self.__world
+
+    #########################   PROTECTED   #########################
+
+    def _advance(self, game):
+        """ Decide per user (smart AIs in one batch), then move every 
+            blob at once
+        """
+        world = self.__world
+        gameboard = game.getGameboard()
+
+        smartSlots = []
+        for user in game.getUsers():
+            if user.isDead().is_set():
+                continue
+            if user.getID() not in self.__slots:
+                self._attachUser(user)
+            if type(user.getDecision()) is AISmartInput:
+                """ Not subclasses, which decide differently """
+                smartSlots.append(self.__slots[user.getID()])
+            else:
+                self._decide(user, game)
+        self._steerSmartAIs(smartSlots, game)
+
+        (width, height) = gameboard.getDimensions()
+        paths = world.advance(self.getTickLength(), width, height,
+                              holdSeconds = self._getHolds())
+
+        for (slot, col, row) in zip(*paths):
+            self._syncToBoard(gameboard, slot, (int(col), int(row)))
+
+        self._resolveCollisions(game, paths)
+
+    def _steerSmartAIs(self, slots, game):
+        """ Make the decisions of every smart AI that are due, in one 
+            batch against a single reading of the human's center
+        """
+        self.__smartClock += self.getTickLength()
+        interval = AISmartInput.DECISION_INTERVAL
+        if self.__smartClock < interval:
+            return
+        self.__smartClock %= interval
+        self.__smartDecisionCount += 1
+
+        if not slots:
+            return
+        try:
+            center = game.getHumanUser().getCenter()
+        except StopIteration:
+            """ Human has been killed but not registered """
+            return
+
+        import numpy
+        slots = numpy.array(slots)
+        detailScheduler = self.getDetailScheduler()
+        if detailScheduler is not None:
+            """ Offset by slot, so the distant AIs don't all decide on
+                the same tick
+            """
+            (x, y, radius) = self.__world.getPositions()
+            slowdowns = detailScheduler.getSlowdowns(x[slots], y[slots])
+            slots = slots[(self.__smartDecisionCount + slots) %
+                          slowdowns == 0]
+        self.__world.steerTowards(slots, center)
+
+    def _getHolds(self):
+        """ Get the seconds of movement each blob must earn before it
+            moves (None without a DetailScheduler). A blob with a
+            slowdown of n moves about once every n ticks
+        """
+        detailScheduler = self.getDetailScheduler()
+        if detailScheduler is None:
+            return None
+        import numpy
+        (x, y, radius) = self.__world.getPositions()
+        slowdowns = detailScheduler.getSlowdowns(x, y)
+        return numpy.where(slowdowns > 1,
+                           (slowdowns - .5) * self.getTickLength(), 0.)
+
+    def _resolveCollisions(self, game, paths):
+        """ Find every collision in one pass and kill the eaten users.
+            Blobs that no mover can reach are left out. Blobs collide
+            along the whole of the paths they moved, so a distant blob
+            making a long jump can't skip over another
+        """
+        world = self.__world
+        (x, y, radius) = world.getPositions()
+        awake = game.getGameboard().getAwake(x, y)
+        slots = None
+        if awake is not None:
+            import numpy
+            slots = numpy.flatnonzero(awake & world.getAlive())
+        for (eater, victim, radiusIncrease) in world.findCollisions(slots,
+                                                                    paths):
+            if world.getUser(eater).isPassive():
+                """ Passive users (food) never eat """
+                continue
+            world.getUser(eater).increaseRadiusByN(radiusIncrease)
+            game.killUserWithID(world.getUser(victim).getID())
+        self._retireKilledUsers(game)
+
+    def _syncToBoard(self, gameboard, slot, oldCenter):
+        """ Move a blob on the board to its new center in the world.
+            Blobs can move several pixels per tick, so one may land on
+            the center of another. The board would block forever, so 
+            back up towards the old center until a free position is found.
+            The collision check that follows settles the overlap
+        """
+        (oldCol, oldRow) = oldCenter
+        (col, row) = self.__world.getCenter(slot)
+        colStep = (oldCol > col) - (oldCol < col)
+        rowStep = (oldRow > row) - (oldRow < row)
+
+        while (col, row) != oldCenter and \
+                gameboard.isPositionOccupied((col, row)):
+            (col, row) = (col + colStep, row + rowStep)
+
+        if (col, row) == oldCenter:
+            self.__world.setCenter(slot, oldCenter)
+        else:
+            gameboard.moveUser(oldCenter, (col, row), 
+                                self.__world.getUser(slot))
+
+    def _attachUser(self, user):
+        """ Move the state of a user into the world """
+        movement = user.getMovement()
+        slot = self.__world.allocate(
+                            user,
+                            movement.getCenter(),
+                            movement.getRadius(),
+                            movement.getCurrentDirection())
+        user.setMovement(WorldCircle_(self.__world, slot))
+        self.__slots[user.getID()] = slot
+        self.__movements[user.getID()] = movement
+
+    def _retireUser(self, user, game):
+        """ Also give the world slot back. The user gets its own movement
+            back (with its last center and radius) since the slot may be
+            reused by someone else
+        """
+        TickEngine._retireUser(self, user, game)
+        slot = self.__slots.pop(user.getID(), None)
+        if slot is None:
+            return
+
+        movement = self.__movements.pop(user.getID())
+        movement.reset(self.__world.getCenter(slot), 
+                       self.__world.getRadius(slot))
+        user.setMovement(movement)
+        self.__world.release(slot)
+
+
+###############################################################################
+##
+##                              AsyncEngine class
+##
+###############################################################################
+class AsyncEngine(object):
+    """Runs every user as coroutines on a single asyncio event loop.
+
+    Each user gets a decision task and a movement task that sleep between
+    decisions and moves, instead of a pair of threads. A user dies by
+    having its tasks cancelled. The loop runs in the calling thread, so
+    the human still handles pygame events in the main thread. The game
+    clock is a sleeping task, and the loop ends when it runs out or the
+    game over flag is set, whichever comes first.
+
+    Attributes:
+        pollInterval: Seconds between spawns of food
+        tasks: Map of userID to the tasks of a living user
+    """
+
+    def __init__(self, pollInterval = Timeout.DECISION):
+        self.__pollInterval = pollInterval
+        self.__tasks        = dict()
+
+    ##########################   GETTERS   ##########################
+
+    def getGameTime(self):
+        """ Seconds of game time. Tasks sleep in real time, so this is
+            the wall clock
+        """
+        return time.time()
+
+    def runsGameClock(self):
+        """ The clock is a task on the event loop, so the game needs no
+            threads to end it
+        """
+        return True
+
+    ##########################   RUNNING   ##########################
+
+    def run(self, game):
+        """ Run the game on an event loop until it is over """
+        import asyncio
+        asyncio.run(self._play(game))
+
+    def userKilled(self, user, game):
+        """ Take a user that was eaten off the board and cancel its tasks.
+            Its eater may hold its position, so it is pulled by id. This
+            happens right away so no one can block on its position
+        """
+        game.getGameboard().pullUserWithID(user.getID())
+        game.recycleUser(user)
+        for task in self.__tasks.pop(user.getID(), ()):
+            task.cancel()
+
+    #########################   PROTECTED   #########################
+
+    async def _play(self, game):
+        """ Start every user, then wait for the game over flag or the
+            end of the clock, whichever comes first
+        """
+        import asyncio
+        for user in game.getUsers():
+            self._startUser(user, game)
+
+        """ The flag may be set from another thread, so the loop is
+            told about it through call_soon_threadsafe
+        """
+        loop = asyncio.get_running_loop()
+        gameOver = asyncio.Event()
+        def setGameOver():
+            loop.call_soon_threadsafe(gameOver.set)
+        gameOverFlag = game.getGameOverFlag()
+        gameOverFlag.addListener(setGameOver)
+
+        clock = asyncio.ensure_future(
+                        asyncio.sleep(max(game.getRemainingTime(), 0)))
+        waiters = [asyncio.ensure_future(gameOver.wait()), clock]
+        foodSpawner = game.getFoodSpawner()
+        if foodSpawner is not None:
+            waiters.append(asyncio.ensure_future(
+                                self._spawnFood(foodSpawner, game)))
+
+        (done, pending) = await asyncio.wait(
+                                waiters, 
+                                return_when = asyncio.FIRST_COMPLETED)
+        gameOverFlag.removeListener(setGameOver)
+        for waiter in pending:
+            waiter.cancel()
+        if clock in done:
+            game.runOutOfTime()
+        await self._stopUsers(game)
+
+    def _startUser(self, user, game):
+        """ Create the tasks of a user. Passive users have none """
+        if user.isPassive():
+            return
+
+        import asyncio
+
+        tasks = [asyncio.ensure_future(self._moveAtInterval(user, game))]
+        if user.getDecisionInterval() is not None:
+            tasks.append(asyncio.ensure_future(
+                                self._decideAtInterval(user, game)))
+        self.__tasks[user.getID()] = tasks
+
+    async def _stopUsers(self, game):
+        """ Cancel the users still alive and take them off the board """
+        import asyncio
+        tasks = []
+        for userTasks in self.__tasks.values():
+            tasks.extend(userTasks)
+        self.__tasks.clear()
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions = True)
+
+    async def _moveAtInterval(self, user, game):
+        """ Move the user at its movement interval. However the task
+            ends, the user leaves the board
+        """
+        import asyncio
+        try:
+            while not user.isDead().is_set():
+                await asyncio.sleep(user.getMovementInterval())
+                user.move(game)
+        finally:
+            game.getGameboard().pullUserWithID(user.getID())
+
+    async def _decideAtInterval(self, user, game):
+        """ Make a decision at every interval until the user dies """
+        import asyncio
+        try:
+            while not user.isDead().is_set():
+                await asyncio.sleep(user.getDecisionInterval())
+                user.makeDecision(game)
+        finally:
+            user.stopDeciding(game)
+
+    async def _spawnFood(self, foodSpawner, game):
+        """ Spawn food at every poll interval """
+        import asyncio
+        while True:
+            await asyncio.sleep(self.__pollInterval)
+            foodSpawner.spawn(game, self.__pollInterval)
+
+
+###############################################################################
+##
+##                              ShardedEngine class
+##
+###############################################################################
+class ShardedEngine(object):
+    """Splits the board into horizontal bands, each simulated by a Shard
+    in its own process (see shards.py).
+
+    The state of every blob lives in a World over SharedArrays, so the
+    shards work on it in place, on as many cores as there are bands.
+    The main process only makes the decisions of steered users (the 
+    human), adds new users, takes eaten users out of the game and keeps
+    the board in step with the shared positions so the renderer can draw.
+    Smart and random AIs decide inside their shard, all at once.
+
+    Attributes:
+        shardCount: The number of bands and shard processes
+        tickLength: Seconds between ticks of the main process and shards
+        capacity: The number of slots in the shared arrays (None to fit
+            the users and the most food the spawner adds)
+        world: The World over the shared arrays
+        slots: Map of userID to its slot in the world
+        movements: Map of userID to the movement a user had before it
+            was attached to the world
+        decisionClocks: Map of userID to time accumulated towards a 
+            decision, for steered users
+        boardCenters: The center of each slot last written to the board
+    """
+
+    def __init__(   self, 
+                    shardCount  = None, 
+                    tickLength  = Timeout.TICK, 
+                    capacity    = None):
+        self.__shardCount       = shardCount or os.cpu_count() or 1
+        self.__tickLength       = tickLength
+        self.__capacity         = capacity
+        self.__world            = None
+        self.__arrays           = None
+        self.__slots            = dict()
+        self.__movements        = dict()
+        self.__decisionClocks   = dict()
+        self.__boardCenters     = None
+
+    ##########################   GETTERS   ##########################
+
+    def getShardCount(self):
+        return self.__shardCount
+
+    def getWorld(self):
+        return self.__world
+
+    def getGameTime(self):
+        """ Seconds of game time. Shards are paced to the wall clock, so
+            this is the wall clock
+        """
+        return time.time()
+
+    def runsGameClock(self):
+        """ The game runs its own clock and game over threads """
+        return False
+
+    ##########################   RUNNING   ##########################
+
+    def run(self, game):
+        """ Start a process per shard and keep the game in step with them
+            until the game is over
+        """
+        import multiprocessing
+        import numpy
+        from shards import SharedArrays, Shard
+        from worlds import World
+        sharedArrays = SharedArrays(self._getCapacity(game))
+        capacity = sharedArrays.getCapacity()
+        self.__arrays = sharedArrays.getArrays()
+        self.__world = World(capacity, self.__arrays)
+        self.__boardCenters = numpy.zeros((capacity, 2), dtype = numpy.int32)
+        for user in game.getUsers():
+            self._attachUser(user, game)
+
+        context = multiprocessing.get_context("spawn")
+        inboxes = [context.Queue() for s in range(self.__shardCount)]
+        stopEvent = context.Event()
+        humanSlot = self.__slots.get(game.getHumanUser().getID())
+        randomStreams = game.getRandomStreams()
+        processes = [context.Process(target = Shard(
+                                        s,
+                                        self.__shardCount,
+                                        capacity,
+                                        sharedArrays.getName(),
+                                        game.getGameboard().getDimensions(),
+                                        humanSlot,
+                                        inboxes,
+                                        stopEvent,
+                                        self.__tickLength,
+                                        randomStreams.spawnSeed()).run)
+                        for s in range(self.__shardCount)]
+        for process in processes:
+            process.start()
+
+        try:
+            self._runMain(game)
+        finally:
+            stopEvent.set()
+            for process in processes:
+                process.join()
+            for user in game.getUsers():
+                self._retireUser(user, game)
+            sharedArrays.close(unlink = True)
+
+    def userKilled(self, user, game):
+        """ Users are only killed from the main process, holding nothing,
+            so they leave the board right away
+        """
+        self._retireUser(user, game)
+
+    #########################   PROTECTED   #########################
+
+    def _getCapacity(self, game):
+        if self.__capacity is not None:
+            return self.__capacity
+        foodSpawner = game.getFoodSpawner()
+        maxFood = foodSpawner.getMaxFood() if foodSpawner is not None else 0
+        return max(1024, 2 * (len(game.getUsers()) + maxFood))
+
+    def _getKind(self, user):
+        """ Get what the shards do with a user """
+        from shards import PASSIVE, STEERED, SMART, RANDOM
+        if user.isPassive():
+            return PASSIVE
+        decisionType = type(user.getDecision())
+        if decisionType is AISmartInput:
+            return SMART
+        if decisionType is AIRandomInput:
+            return RANDOM
+        return STEERED
+
+    def _runMain(self, game):
+        """ Tick the main process until the game is over """
+        gameOverFlag = game.getGameOverFlag()
+        foodSpawner = game.getFoodSpawner()
+        nextTick = time.time()
+
+        while not gameOverFlag.is_set():
+            if foodSpawner is not None:
+                foodSpawner.spawn(game, self.__tickLength)
+            self._syncUsers(game)
+
+            nextTick += self.__tickLength
+            delay = nextTick - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                nextTick = time.time()
+
+    def _syncUsers(self, game):
+        """ Attach new users, decide for steered users, take eaten users
+            out of the game and move the rest on the board
+        """
+        import numpy
+        from shards import STEERED, EATEN
+        world = self.__world
+        for user in game.getUsers():
+            if user.isDead().is_set():
+                continue
+            if user.getID() not in self.__slots:
+                self._attachUser(user, game)
+            elif self.__arrays["kind"][self.__slots[user.getID()]] == \
+                    STEERED:
+                self._decide(user, game)
+
+        alive = self.__arrays["alive"]
+        for slot in numpy.flatnonzero(alive & 
+                                      (self.__arrays["owner"] == EATEN)):
+            game.killUserWithID(world.getUser(slot).getID())
+
+        (x, y, radius) = world.getPositions()
+        boardCenters = self.__boardCenters
+        moved = numpy.flatnonzero(alive & ((x != boardCenters[:, 0]) |
+                                           (y != boardCenters[:, 1])))
+        gameboard = game.getGameboard()
+        for slot in moved.tolist():
+            center = (int(x[slot]), int(y[slot]))
+            if gameboard.isPositionOccupied(center):
+                """ Someone is still on the board there. Try next tick """
+                continue
+            """ The shards own the shared center, so it is only moved 
+                on the board
+            """
+            gameboard.moveUser(tuple(boardCenters[slot].tolist()), center,
+                               world.getUser(slot), setCenter = False)
+            boardCenters[slot] = center
+
+    def _decide(self, user, game):
+        """ Make the decision of a steered user if one is due """
+        interval = user.getDecisionInterval()
+        if interval is None:
+            return
+
+        userID = user.getID()
+        clock = self.__decisionClocks.get(userID, 0) + self.__tickLength
+        if clock >= interval:
+            clock -= interval
+            user.makeDecision(game)
+        self.__decisionClocks[userID] = clock
+
+    def _attachUser(self, user, game):
+        """ Move the state of a user into the shared world. A user that
+            doesn't fit stays where it is on the board
+        """
+        from shards import getBand
+        movement = user.getMovement()
+        center = movement.getCenter()
+        (width, height) = game.getGameboard().getDimensions()
+        """ The kind and owner are written before the slot is alive, so
+            no shard sees the blob with those of the last one
+        """
+        slot = self.__world.allocate(
+                            user,
+                            center,
+                            movement.getRadius(),
+                            movement.getCurrentDirection(),
+                            extras = dict(
+                                kind    = self._getKind(user),
+                                owner   = getBand(center[1], height,
+                                                  self.__shardCount)))
+        if slot is None:
+            return
+
+        self.__boardCenters[slot] = center
+        user.setMovement(WorldCircle_(self.__world, slot))
+        self.__slots[user.getID()] = slot
+        self.__movements[user.getID()] = movement
+
+    def _retireUser(self, user, game):
+        """ Take a user off the board and give its slot back. The user
+            gets its own movement back, with its last center and radius
+        """
+        userID = user.getID()
+        self.__decisionClocks.pop(userID, None)
+        user.stopDeciding(game)
+        game.getGameboard().pullUserWithID(userID)
+        game.recycleUser(user)
+
+        slot = self.__slots.pop(userID, None)
+        if slot is None:
+            return
+
+        """ Messages still queued about the blob are dropped once the
+            generation of its slot changes
+        """
+        from shards import EATEN
+        self.__arrays["owner"][slot] = EATEN
+        self.__arrays["generation"][slot] += 1
+        movement = self.__movements.pop(userID)
+        movement.reset(self.__world.getCenter(slot), 
+                       self.__world.getRadius(slot))
+        user.setMovement(movement)
+        self.__world.release(slot)
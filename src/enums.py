@@ -10,6 +10,7 @@
 #		Color
 #		InitialUserRadius
 #		Timeout
+#		FrameRate
 
 def enum(**named_values):
 	return type('Enum', (), named_values)
@@ -26,16 +27,24 @@ Color = enum(
 	WHITE 	= (255, 255, 255),
 	BLUE 	= (0, 0, 255),
 	GREEN 	= (0, 255, 0),
-	RED 	= (255, 0, 0))
+	RED 	= (255, 0, 0),
+	ORANGE 	= (255, 165, 0),
+	PURPLE 	= (128, 0, 128))
 
 InitialUserRadius = enum(
 	FOOD		= 5,
 	AISMART		= 25,
 	AIRANDOM 	= 15,
+	AIHUNTER	= 20,
 	HUMAN		= 10)
 
 Timeout = enum(
 	MOVEMENT 		= .0003,
 	DECISION 		= .05,
 	SLOWDECISION 	= .1,
-	GAMEOVER 		= .0001)
\ No newline at end of file
+	GAMEOVER 		= .0001,
+	TICK 			= .01)
+
+FrameRate = enum(
+	TARGET 		= 60,
+	MAXSKIP 	= 4)
\ No newline at end of file
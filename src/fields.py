@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+
+#   fields.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of field classes:
+#       FlowField
+
+import heapq
+import threading
+from enums import Direction
+
+## Cost of crossing a cell covered by a blob that would eat a pursuer
+THREAT_COST = 20
+
+## Direction towards each neighbouring cell, and its (column, row) step
+NEIGHBOURS = (
+    (Direction.LEFT,    (-1, 0)),
+    (Direction.RIGHT,   (1, 0)),
+    (Direction.UP,      (0, -1)),
+    (Direction.DOWN,    (0, 1)))
+
+###############################################################################
+##
+##                              FlowField class
+##
+###############################################################################
+class FlowField(object):
+    """The direction to take from anywhere on the board to reach the human
+    along the cheapest path, shared by every pursuer.
+
+    The board is split into a coarse grid of cells. The distance from each
+    cell to the cell of the human is found with Dijkstra's algorithm, where
+    a cell covered by a blob larger than the pursuer costs THREAT_COST to
+    cross instead of 1, so pursuers go around blobs that would eat them.
+    Each cell then points at its closest neighbour. Which cells are
+    threats depends on the size of the pursuer, so there is a field for
+    every pursuer radius, built from the largest radius covering each
+    cell. That is found once per update and shared by every field.
+
+    A field is a full rebuild over the grid, so its cost is bounded by
+    how often it runs: when the human moves into another cell, but no
+    more often than every minAge seconds (until then pursuers head for
+    the old cell, and go straight for the human once there), and once it
+    is maxAge seconds old since the threats move as well. Fields of radii
+    no pursuer has asked for within maxAge are dropped. Age is measured
+    in the game time of the engine, so an unpaced TickEngine rebuilds the
+    fields on the same ticks every replay. Looking up a direction costs
+    the same however many pursuers there are.
+
+    Attributes:
+        cellSize: The width and height of a cell
+        minAge: Seconds of game time a field is kept for even if the
+            human has changed cell
+        maxAge: Seconds of game time after which a field is rebuilt
+            anyway
+        fields: Map of pursuer radius to (directions, targetCell, 
+            builtAt), the rows of the direction to take from each cell 
+            (None in the cell of the human), the cell of the human when
+            the field was built and the game time it was built at
+        threats: Rows of the largest radius covering each cell (other
+            than the human's), and the game time they were found at
+        buildCount: The number of times a field was built
+        mutex: Ensures only one thread rebuilds the fields
+    """
+
+    def __init__(   self,
+                    cellSize    = 32,
+                    minAge      = .1,
+                    maxAge      = 1.):
+        self.__cellSize     = cellSize
+        self.__minAge       = minAge
+        self.__maxAge       = maxAge
+        self.__fields       = dict()
+        self.__threats      = (None, None)
+        self.__buildCount   = 0
+        self.__mutex        = threading.Lock()
+
+    ##########################   GETTERS   ##########################
+
+    def getCellSize(self):
+        return self.__cellSize
+
+    def getBuildCount(self):
+        return self.__buildCount
+
+    def getCell(self, centerPosition):
+        (col, row) = centerPosition
+        return col // self.__cellSize, row // self.__cellSize
+
+    def getDirection(self, game, centerPosition, radius):
+        """ Get the direction a pursuer of radius takes from a position
+            towards the human. None if the position is in the cell the
+            field leads to, or there is no human
+        """
+        field = self.update(game, radius)
+        if field is None:
+            return None
+
+        (column, row) = self.getCell(centerPosition)
+        return field[0][row][column]
+
+    ##########################   SETTERS   ##########################
+
+    def update(self, game, radius):
+        """ Rebuild the field of a pursuer radius if it is stale, and
+            return it (None if there is no human)
+        """
+        try:
+            human = game.getHumanUser()
+            targetCell = self.getCell(human.getCenter())
+        except StopIteration:
+            """ Human has been killed but not registered """
+            return None
+
+        gameTime = game.getEngine().getGameTime()
+        field = self.__fields.get(radius)
+        if not self._isStale(field, targetCell, gameTime):
+            return field
+        with self.__mutex:
+            """ Another pursuer may have rebuilt it while we waited """
+            field = self.__fields.get(radius)
+            if self._isStale(field, targetCell, gameTime):
+                field = self._build(game.getGameboard(), targetCell, 
+                                    human.getID(), radius, gameTime)
+            return field
+
+    #########################   PROTECTED   #########################
+
+    def _isStale(self, field, targetCell, gameTime):
+        if field is None:
+            return True
+        age = gameTime - field[2]
+        return age >= self.__maxAge or \
+               (targetCell != field[1] and age >= self.__minAge)
+
+    def _build(self, gameboard, targetCell, humanID, radius, gameTime):
+        """ Find the distance of every cell to the target cell, then point
+            every cell at its closest neighbour. Must hold mutex
+        """
+        threatRadii = self._getThreatRadii(gameboard, humanID, gameTime)
+        (rows, columns) = (len(threatRadii), len(threatRadii[0]))
+
+        distances = [[None] * columns for r in range(rows)]
+        queue = [(0, targetCell)]
+        while queue:
+            (distance, (column, row)) = heapq.heappop(queue)
+            if distances[row][column] is not None:
+                continue
+            distances[row][column] = distance
+
+            """ A pursuer in a neighbouring cell pays for entering
+                this one
+            """
+            cost = THREAT_COST if threatRadii[row][column] > radius else 1
+            for (direction, (columnStep, rowStep)) in NEIGHBOURS:
+                (nextColumn, nextRow) = (column + columnStep, row + rowStep)
+                if 0 <= nextColumn < columns and 0 <= nextRow < rows and \
+                        distances[nextRow][nextColumn] is None:
+                    heapq.heappush(queue,
+                                   (distance + cost, (nextColumn, nextRow)))
+
+        directions = [[None] * columns for r in range(rows)]
+        for row in range(rows):
+            for column in range(columns):
+                closest = distances[row][column]
+                for (direction, (columnStep, rowStep)) in NEIGHBOURS:
+                    (nextColumn, nextRow) = (column + columnStep,
+                                             row + rowStep)
+                    if 0 <= nextColumn < columns and 0 <= nextRow < rows \
+                            and distances[nextRow][nextColumn] < closest:
+                        closest = distances[nextRow][nextColumn]
+                        directions[row][column] = direction
+
+        """ Drop the fields of radii no pursuer has asked for lately """
+        for (oldRadius, field) in list(self.__fields.items()):
+            if gameTime - field[2] >= self.__maxAge:
+                del self.__fields[oldRadius]
+
+        field = (directions, targetCell, gameTime)
+        self.__fields[radius] = field
+        self.__buildCount += 1
+        return field
+
+    def _getThreatRadii(self, gameboard, humanID, gameTime):
+        """ Get the largest radius of a blob (other than the human) 
+            covering each cell. They are found again once they are minAge
+            old. Must hold mutex
+        """
+        (threatRadii, foundAt) = self.__threats
+        if threatRadii is not None and gameTime - foundAt < self.__minAge:
+            return threatRadii
+
+        (width, height) = gameboard.getDimensions()
+        (columns, rows) = self.getCell((width, height))
+        (columns, rows) = (columns + 1, rows + 1)
+        threatRadii = [[0] * columns for r in range(rows)]
+
+        for (userID, center, radius) in gameboard.getIndex().queryRect(
+                                                    0, 0, width, height):
+            if userID == humanID:
+                continue
+            (col, row) = center
+            (firstColumn, firstRow) = self.getCell((max(col - radius, 0),
+                                                    max(row - radius, 0)))
+            (lastColumn, lastRow) = self.getCell((col + radius,
+                                                  row + radius))
+            for r in range(firstRow, min(lastRow, rows - 1) + 1):
+                cells = threatRadii[r]
+                for c in range(firstColumn,
+                               min(lastColumn, columns - 1) + 1):
+                    if radius > cells[c]:
+                        cells[c] = radius
+
+        self.__threats = (threatRadii, gameTime)
+        return threatRadii
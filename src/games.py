@@ -7,15 +7,19 @@
 #
 #   List of game classes:
 #       Game
+#       GameOverFlag
 
 import threading
-import pygame
-from random import randint
 from time import sleep
 import time
 from boards import SyncGameBoard
-from users import Food, AISmart, AIRandom
-from enums import Timeout
+from users import Food, AISmart, AIRandom, AIPursuer, AIHunter
+from decisions import AIPursuitInput, AIRandomInput
+from fields import FlowField
+from streams import RandomStreams, ChoiceStream
+from registries import UserRegistry
+from pools import UserPool
+from engines import ThreadedEngine
 
 ## Number of seconds between when screen is 
 ## shown to the user and movement begins
@@ -30,12 +34,27 @@ class Game(object):
     """A Game. Base class for all games.
 
     Attributes:
-        userList: the list of users participating
+        users: the registry of users participating
         gameboard: the board that is being played on
+        engine: the engine that runs user decisions and movements
+        renderer: the renderer that draws the board (a FullRenderer
+            created by start if none is given)
+        frameScheduler: paces how often the renderer draws (a
+            FrameScheduler created by start if none is given)
+        foodSpawner: adds food while the game runs (or None)
+        userPool: users that were eaten and can be reused
+        flowField: the FlowField that pursuers follow to the human
+        randomStreams: the RandomStreams every random choice of the game
+            is drawn from, so a game can be replayed from its seed
+        placement: the stream that positions new users
+        foodCount: The number of food items created so far
         endTime: The time at which the gameOverTimeout will be set
         gameTimeSeconds: The number of seconds the game will last
         gameOverFlag: a flag that is set when the game finishes
         gameOverTimeout: a flag that is set when the game runs out of time
+        reportStartup: If set, the startup times are printed once the
+            users are on the board
+        startupTimes: List of (phase, seconds) spent starting the game
     """
 
     def __init__(   self,
@@ -44,19 +63,44 @@ class Game(object):
                     initialSmartAiCount     = 0,
                     initialRandomAiCount    = 0,
                     gameTimeSeconds         = 30,
-                    boardType               = SyncGameBoard()):
-        self.__userList         = []
-        self.__gameboard        = boardType
+                    boardType               = None,
+                    engineType              = None,
+                    rendererType            = None,
+                    frameScheduler          = None,
+                    foodSpawner             = None,
+                    userPool                = None,
+                    reportStartup           = False,
+                    initialPursuerAiCount   = 0,
+                    flowField               = None,
+                    initialHunterAiCount    = 0,
+                    seed                    = None):
+        startTime = time.time()
+        self.__users            = UserRegistry()
+        self.__gameboard        = boardType or SyncGameBoard()
+        self.__engine           = engineType or ThreadedEngine()
+        self.__renderer         = rendererType
+        self.__frameScheduler   = frameScheduler
+        self.__foodSpawner      = foodSpawner
+        self.__userPool         = userPool or UserPool()
+        self.__foodCount        = 0
         self.__endTime          = None
         self.__gameTimeSeconds  = gameTimeSeconds
-        self.__gameOverFlag     = threading.Event()
+        self.__gameOverFlag     = GameOverFlag()
         self.__gameOverTimeout  = threading.Event()
+        self.__reportStartup    = reportStartup
+        self.__startupTimes     = []
+        self.__flowField        = flowField or FlowField()
+        self.__randomStreams    = RandomStreams(seed)
+        self.__placement        = self.__randomStreams.createPlacement()
 
         self.createUsers(
             initialFoodCount, 
             initialSmartAiCount, 
             initialRandomAiCount,
-            humanUser)
+            humanUser,
+            initialPursuerAiCount,
+            initialHunterAiCount)
+        self._recordStartupPhase("create users", startTime)
 
     
 
@@ -64,32 +108,51 @@ class Game(object):
 
 
     #------------------------- END PAGE 1 --------------------------#
-    def createUsers(self, foodCount, smartAiCount, randomAiCount, human):
+    def createUsers(self, foodCount, smartAiCount, randomAiCount, human,
+                    pursuerAiCount = 0, hunterAiCount = 0):
         """ Create the oppponents and add them to the player list """
         maxWidth, maxHeight = self.__gameboard.getDimensions()
+        randint = self._randint
 
         wMin, wMax = (20, maxWidth - 20)
         hMin, hMax = (20, maxHeight - 20)
 
-        for f in range(1, foodCount + 1):
-            self.__userList.append(
-                Food( 
-                    id_ = "food_" + str(f),
-                    initialCenter = (randint(wMin, wMax), 
-                                     randint(hMin, hMax))))
+        self.createFood([(randint(wMin, wMax), randint(hMin, hMax))
+                            for f in range(foodCount)])
 
         for a in range(1, smartAiCount + 1):
             """ Ensure that smart AI's start on the other half of the board """
-            self.__userList.append(
+            self.__users.addUser(
                 AISmart( 
                     id_ = "smart_ai_" + str(a),
                     initialCenter = (randint(wMin, wMax), 
                                      randint(int(hMax/2), hMax))))
 
         for a in range(1, randomAiCount + 1):
-            self.__userList.append(
+            """ Each random AI turns with a stream of its own """
+            choices = ChoiceStream(len(AIRandomInput.DIRECTIONS),
+                                   self.__randomStreams.spawnGenerator())
+            self.__users.addUser(
                 AIRandom( 
                     id_ = "random_ai_" + str(a),
+                    initialCenter = (randint(wMin, wMax), 
+                                     randint(hMin, hMax)),
+                    randomDecision = AIRandomInput(choices)))
+
+        """ Pursuers share one decision, and so one flow field """
+        pursuitDecision = AIPursuitInput(self.__flowField)
+        for a in range(1, pursuerAiCount + 1):
+            self.__users.addUser(
+                AIPursuer( 
+                    id_ = "pursuer_ai_" + str(a),
+                    initialCenter = (randint(wMin, wMax), 
+                                     randint(int(hMax/2), hMax)),
+                    pursuitDecision = pursuitDecision))
+
+        for a in range(1, hunterAiCount + 1):
+            self.__users.addUser(
+                AIHunter( 
+                    id_ = "hunter_ai_" + str(a),
                     initialCenter = (randint(wMin, wMax), 
                                      randint(hMin, hMax))))
 
@@ -100,28 +163,109 @@ class Game(object):
         so if you start it before the others, the infinite loop will
         run and no other users will be created
         """
-        self.__userList.append(human)
+        self.__users.addUser(human)
+
+    def createFood(self, centers):
+        """ Create a food item at each center and add them all at once """
+        food = []
+        for center in centers:
+            self.__foodCount += 1
+            foodID = "food_" + str(self.__foodCount)
+            item = self.__userPool.acquire(Food, foodID, center)
+            if item is None:
+                item = Food(id_ = foodID, initialCenter = center)
+            food.append(item)
+        self.__users.addUsers(food)
+        return food
+
+    def spawnFood(self, count):
+        """ Add food at up to count random free positions while the game
+            runs. Returns the number of food items added
+        """
+        gameboard = self.__gameboard
+        (maxWidth, maxHeight) = gameboard.getDimensions()
+        randint = self._randint
+        centers = []
+        for f in range(count):
+            center = (randint(20, maxWidth - 20), randint(20, maxHeight - 20))
+            if center not in centers and \
+                    not gameboard.isPositionOccupied(center):
+                centers.append(center)
+
+        for food in self.createFood(centers):
+            self._placeUserOnBoard(food)
+        return len(centers)
 
     ##########################   GETTERS   ##########################
 
     def getGameboard(self):
         return self.__gameboard
 
+    def getEngine(self):
+        return self.__engine
+
+    def getFrameScheduler(self):
+        return self.__frameScheduler
+
+    def getFoodSpawner(self):
+        return self.__foodSpawner
+
+    def getFlowField(self):
+        return self.__flowField
+
+    def getRandomStreams(self):
+        return self.__randomStreams
+
+    def getSeed(self):
+        """ The seed that replays this game """
+        return self.__randomStreams.getSeed()
+
+    def getUserPool(self):
+        return self.__userPool
+
+    def getFoodCount(self):
+        """ Get the number of food items in the game """
+        return self.__users.getFoodCount()
+
     def getGameOverFlag(self):
         return self.__gameOverFlag
 
     def getUserFromID(self, userID):
         """ raises StopIteration if userID not found """
-        u = next(user for user in self.__userList if user.getID() == userID)
-        return u
+        return self.__users.getUser(userID)
+
+    def getUsers(self):
+        """ Get a snapshot of all users that are alive """
+        return self.__users.getSnapshot()
 
     def getHumanUser(self):
         """ Get the human user """
         return self.getUserFromID("human")
 
-    def _getRemainingTime(self):
+    def getUsersInView(self):
+        """ Get the users that may overlap the part of the board shown
+            on the display. Only the board index is searched, so this
+            costs the number of visible users rather than all users
+        """
+        if self.__gameboard.getCamera().showsWholeBoard():
+            return self.getUsers()
+
+        users = []
+        for (userID, center, radius) in self.__gameboard.getPlayersInView():
+            try:
+                users.append(self.__users.getUser(userID))
+            except StopIteration:
+                """ User was killed after the board was searched """
+                pass
+        return users
+
+    def getRemainingTime(self):
         return int(self.__endTime - time.time())
 
+    def getStartupTimes(self):
+        """ Get (phase, seconds) for every phase of startup so far """
+        return list(self.__startupTimes)
+
     
 
 
@@ -135,11 +279,11 @@ class Game(object):
     def killUserWithID(self, userID):
         """ Kill a user """
         try:
-            u = self.getUserFromID(userID)
+            u = self.__users.removeUser(userID)
             u.quit()
-            self.__userList.remove(u)
+            self.__engine.userKilled(u, self)
 
-            if len(self.__userList) == 1:
+            if len(self.__users) == 1:
                 """ Only human remains """
                 self.__gameOverFlag.set()
                 self._win()
@@ -148,40 +292,100 @@ class Game(object):
             """ userID not in game currently """
             pass
 
+    def runOutOfTime(self):
+        """ End the game because the clock ran out """
+        self.__gameOverTimeout.set()
+        self._outOfTimeMessage()
+        self.__gameOverFlag.set()
+
+    def recycleUser(self, user):
+        """ Offer a dead user that has left the board for reuse """
+        self.__userPool.release(user)
+
+    def followHuman(self):
+        """ Center the camera on the human """
+        try:
+            center = self.getHumanUser().getCenter()
+        except StopIteration:
+            """ Human has been killed. Keep the last view """
+            return
+        self.__gameboard.getCamera().follow(center)
+
     def pullUserFromBoard(self, position):
         self.__gameboard.pullUserFromBoard(position)
 
     def _setRemainingTime(self, remainingTime):
         self.__endTime = time.time() + remainingTime
 
+    def _randint(self, low, high):
+        """ Random integer in [low, high] from the placement stream """
+        return self.__placement.randint(low, high)
+
     ########################   START GAME   #########################
 
     def start(self):
-        """ Start the game """
+        """ Start the game. pygame, the display and the position storage
+            of the board are only created here
+        """
+        startTime = time.time()
+        """ pygame (and the renderers using it) is only imported here, so
+            importing games stays fast
+        """
+        import pygame
+        from renderers import FullRenderer, FrameScheduler
         pygame.init()
+        self.__renderer = self.__renderer or FullRenderer()
+        self.__frameScheduler = self.__frameScheduler or FrameScheduler()
+        self._recordStartupPhase("pygame", startTime)
+
+        startTime = time.time()
         self.__gameboard.initialize()
+        self._recordStartupPhase("board", startTime)
 
         self._startDrawing()
         self._startUsers()
 
     def _startUsers(self):
         """ Place all the users on the board """
-        for user in self.__userList:
+        startTime = time.time()
+        for user in self.__users.getSnapshot():
             self._placeUserOnBoard(user)
+        self._recordStartupPhase("place users", startTime)
+
+        if self.__reportStartup:
+            self._printStartupTimes()
 
         """ Delay start so user has time to see board and make plan """
         sleep(COUNTDOWN_DELAY)
 
-        """ Set game clock and prepare game over threads """
+        """ Set game clock and prepare game over threads. An engine that
+            runs the game clock itself needs neither thread
+        """
         self._setRemainingTime(self.__gameTimeSeconds)
+        if self.__engine.runsGameClock():
+            self.__engine.run(self)
+            self._gameOver()
+            return
         self._startGameOverListener()
 
         """ Start user movement """
-        for user in self.__userList:
-            user.start(self)
+        self.__engine.run(self)
 
     def _placeUserOnBoard(self, user):
-        self.__gameboard.placeUserOnBoard(user.getCenter(), user.getID())
+        self.__gameboard.placeUserOnBoard(
+                            user.getCenter(), 
+                            user.getID(), 
+                            user.getRadius(),
+                            user.isPassive())
+
+    def _recordStartupPhase(self, phase, startTime):
+        """ Record the time spent in a phase that began at startTime """
+        self.__startupTimes.append((phase, time.time() - startTime))
+
+    def _printStartupTimes(self):
+        """ Print how long each phase of startup took """
+        for (phase, seconds) in self.__startupTimes:
+            print("%-12s %7.1f ms" % (phase, 1000 * seconds))
 
 
 
@@ -219,14 +423,13 @@ class Game(object):
     def _waitForGameOverTimeout(self):
         """ Wait for game clock to run out """
         while not self.__gameOverTimeout.wait(timeout = .5):
-            if self._getRemainingTime() <= 0:
-                self.__gameOverTimeout.set()
-                self._outOfTimeMessage()
+            if self.getRemainingTime() <= 0:
+                self.runOutOfTime()
         self.__gameOverFlag.set()
 
     def _gameOver(self):
         """ Quit all user threads """
-        for user in self.__userList:
+        for user in self.__users.getSnapshot():
             user.quit()
 
     def _outOfTimeMessage(self):
@@ -249,25 +452,52 @@ class Game(object):
         drawingThread.start()
 
     def _drawAtInterval(self):
-        """ Draw the gameboard rapidly to account for position changes """
+        """ Draw the gameboard at the frame rate of the scheduler """
         self._setRemainingTime(COUNTDOWN_DELAY)
-
-        while not self.__gameOverFlag.wait(timeout=Timeout.GAMEOVER):
-            self._draw()
-
-    
-
+        self.__frameScheduler.run(self, self.__renderer)
 
 
+###############################################################################
+##
+##                              GameOverFlag class
+##
+###############################################################################
+class GameOverFlag(threading.Event):
+    """ The flag that is set when the game finishes. Besides being waited
+        on like any event, it calls its listeners once it is set, so an
+        event loop can hear about it without a thread blocked on it
 
+    Attributes:
+        listeners: Callables to call once the flag is set
+        lock: Lock held while the listeners are changed
+    """
 
-    #------------------------- END PAGE 4 --------------------------#
-    def _draw(self):
-        """ Draw the gameboard with all active users and time remaining """
-        self.__gameboard.updateBackground()
-        self.__gameboard.updateTimeClock(self._getRemainingTime())
+    def __init__(self):
+        threading.Event.__init__(self)
+        self.__listeners    = []
+        self.__lock         = threading.Lock()
 
-        for user in self.__userList:
-            user.draw()
-        
-        self.__gameboard.updateDisplay()
\ No newline at end of file
+    def addListener(self, listener):
+        """ Call listener once the flag is set. If it already is, the
+            listener is called right away
+        """
+        with self.__lock:
+            if not self.is_set():
+                self.__listeners.append(listener)
+                return
+        listener()
+
+    def removeListener(self, listener):
+        with self.__lock:
+            if listener in self.__listeners:
+                self.__listeners.remove(listener)
+
+    def set(self):
+        """ Set the flag. The listeners are called by the first set only,
+            in the thread that set it
+        """
+        with self.__lock:
+            (listeners, self.__listeners) = (self.__listeners, [])
+            threading.Event.set(self)
+        for listener in listeners:
+            listener()
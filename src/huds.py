@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+
+#   huds.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of hud classes:
+#       Hud
+#       Overlay
+#       ClockOverlay
+#       ScoreOverlay
+#       PlayerCountOverlay
+#       FpsOverlay
+
+from caches import LRUCache
+from enums import Color
+
+## The most rendered text surfaces kept at once
+TEXT_CACHE_SIZE = 128
+
+###############################################################################
+##
+##                              Hud class
+##
+###############################################################################
+class Hud(object):
+    """The heads-up display drawn on top of the board.
+
+    Fonts are loaded once per size. Rendered text is cached by
+    (text, color, size), so an overlay whose text didn't change since
+    the last frame costs a single blit.
+
+    Attributes:
+        overlays: The overlays that are drawn, in order
+        fonts: Map of font size to pygame font
+        textCache: LRUCache of (text, color, size) to rendered surface
+    """
+
+    def __init__(self, overlays = None):
+        self.__overlays     = list(overlays) if overlays is not None \
+                                else [ClockOverlay()]
+        self.__fonts        = dict()
+        self.__textCache    = LRUCache(TEXT_CACHE_SIZE)
+
+    ##########################   GETTERS   ##########################
+
+    def getOverlays(self):
+        return tuple(self.__overlays)
+
+    def getTextCache(self):
+        return self.__textCache
+
+    def getFont(self, size):
+        """ Get a font, loading it the first time a size is used """
+        font = self.__fonts.get(size)
+        if font is None:
+            import pygame
+            font = self.__fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def renderText(self, text, color, size):
+        """ Get a surface with the text drawn on it """
+        return self.__textCache.get(
+                    (text, color, size),
+                    lambda: self.getFont(size).render(text, 1, color))
+
+    def renderOverlay(self, overlay, text):
+        """ Get the surface and rect for an overlay showing text """
+        image = self.renderText(text, overlay.getColor(), overlay.getSize())
+        return image, image.get_rect(topleft = overlay.getPosition())
+
+    ##########################   SETTERS   ##########################
+
+    def addOverlay(self, overlay):
+        self.__overlays.append(overlay)
+
+    def draw(self, surface, game):
+        """ Draw every overlay onto a surface """
+        for overlay in self.__overlays:
+            (image, rect) = self.renderOverlay(overlay, overlay.getText(game))
+            surface.blit(image, rect)
+
+
+###############################################################################
+##
+##                              Overlay class
+##
+###############################################################################
+class Overlay(object):
+    """A line of text on the HUD. Base class for all overlays.
+
+    Attributes:
+        color: The color of the text
+        size: The font size of the text
+        position: The top left corner of the text
+    """
+
+    def __init__(self, color = Color.RED, size = 36, position = (30, 0)):
+        self.__color    = color
+        self.__size     = size
+        self.__position = position
+
+    def getColor(self):
+        return self.__color
+
+    def getSize(self):
+        return self.__size
+
+    def getPosition(self):
+        return self.__position
+
+    def getText(self, game):
+        """ The text to show. Subclasses override this """
+        return ""
+
+
+###############################################################################
+##
+##                              ClockOverlay class
+##
+###############################################################################
+class ClockOverlay(Overlay):
+    """ Seconds remaining in the game """
+
+    def getText(self, game):
+        return str(game.getRemainingTime())
+
+
+###############################################################################
+##
+##                              ScoreOverlay class
+##
+###############################################################################
+class ScoreOverlay(Overlay):
+    """ Radius of the human """
+
+    def __init__(self, color = Color.BLACK, size = 25, position = (30, 30)):
+        Overlay.__init__(self, color, size, position)
+
+    def getText(self, game):
+        try:
+            return "Score: %s" % game.getHumanUser().getRadius()
+        except StopIteration:
+            """ Human has been killed """
+            return "Score: -"
+
+
+###############################################################################
+##
+##                              PlayerCountOverlay class
+##
+###############################################################################
+class PlayerCountOverlay(Overlay):
+    """ Number of users still in the game """
+
+    def __init__(self, color = Color.BLACK, size = 25, position = (30, 50)):
+        Overlay.__init__(self, color, size, position)
+
+    def getText(self, game):
+        return "Players: %s" % len(game.getUsers())
+
+
+###############################################################################
+##
+##                              FpsOverlay class
+##
+###############################################################################
+class FpsOverlay(Overlay):
+    """ Frame rate measured by the frame scheduler """
+
+    def __init__(self, color = Color.BLACK, size = 25, position = (30, 70)):
+        Overlay.__init__(self, color, size, position)
+
+    def getText(self, game):
+        return "FPS: %d" % game.getFrameScheduler().getFramesPerSecond()
@@ -0,0 +1,466 @@
+#!/usr/bin/env python
+
+#   indexes.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of board index classes:
+#       SpatialHash
+#       LooseQuadtree
+
+import threading
+from enums import InitialUserRadius
+
+def queryNearest(index, centerPosition, count, maxDistance, accept, 
+                 distance):
+    """ Find the count players centered nearest to a position with an
+        index, by querying squares of growing size. The search starts at
+        distance and doubles it until enough players are centered within
+        it, or the square holds every player of the index.
+    """
+    (centerCol, centerRow) = centerPosition
+    while True:
+        if maxDistance is not None:
+            distance = min(distance, maxDistance)
+        candidates = index.queryRect(centerCol - distance, 
+                                     centerRow - distance,
+                                     centerCol + distance, 
+                                     centerRow + distance)
+
+        """ Players in the corners of the square may be further away than
+            others outside of it, unless nothing is outside of it
+        """
+        reach = distance
+        seenAll = len(candidates) >= len(index)
+        if seenAll and maxDistance is None:
+            reach = float("inf")
+
+        found = []
+        for (userID, center, radius) in candidates:
+            squaredDistance = (center[0] - centerCol) ** 2 + \
+                              (center[1] - centerRow) ** 2
+            if squaredDistance <= reach ** 2 and \
+                    (accept is None or accept(userID, center, radius)):
+                found.append((squaredDistance, userID, center, radius))
+
+        if len(found) >= count or seenAll or distance == maxDistance:
+            found.sort()
+            return [(userID, center, radius) 
+                        for (squaredDistance, userID, center, radius)
+                        in found[:count]]
+        distance *= 2
+
+###############################################################################
+##
+##                              SpatialHash class
+##
+###############################################################################
+class SpatialHash(object):
+    """A uniform grid of buckets holding the center of every player.
+
+    A query only looks at the buckets that overlap the area it covers, so
+    its cost depends on the number of nearby players rather than on the
+    size of the area. The bucket size is fixed. Players with a radius
+    larger than a bucket are kept out of the buckets in a separate map
+    that every query checks, so a single huge blob doesn't make the
+    buckets of everyone else larger. There are only ever a few of them.
+
+    Attributes:
+        cellSize: The width and height of a bucket
+        buckets: Map of bucket to {userID: (center, radius)}
+        oversized: Map of userID to (center, radius) of the players with
+            a radius larger than cellSize
+        entries: Map of userID to (bucket, center, radius). The bucket
+            is None for oversized players
+        bucketRadius: The largest radius that was put in a bucket (at
+            most cellSize)
+        mutex: Controls atomic access to the buckets and entries
+    """
+
+    def __init__(self, cellSize = 2 * InitialUserRadius.AISMART):
+        self.__cellSize     = cellSize
+        self.__buckets      = dict()
+        self.__oversized    = dict()
+        self.__entries      = dict()
+        self.__bucketRadius = 0
+        self.__mutex        = threading.Lock()
+
+    ##########################   GETTERS   ##########################
+
+    def getCellSize(self):
+        return self.__cellSize
+
+    def getMaxRadius(self):
+        """ Get the largest radius of a player in the index. It drops
+            again once the oversized players are gone
+        """
+        with self.__mutex:
+            return max([self.__bucketRadius] + 
+                       [radius for (center, radius) 
+                            in self.__oversized.values()])
+
+    def getEntry(self, userID):
+        """ Get the (center, radius) of a player or None """
+        with self.__mutex:
+            entry = self.__entries.get(userID)
+
+        if entry is None:
+            return None
+        return entry[1], entry[2]
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def queryRect(self, left, top, right, bottom):
+        """ Get (userID, center, radius) of players centered in a rect """
+        found = []
+
+        (firstCol, firstRow) = self._getBucket((left, top))
+        (lastCol, lastRow) = self._getBucket((right, bottom))
+        with self.__mutex:
+            for bucketCol in range(firstCol, lastCol + 1):
+                for bucketRow in range(firstRow, lastRow + 1):
+                    bucket = self.__buckets.get((bucketCol, bucketRow))
+                    if not bucket:
+                        continue
+                    for userID, (center, radius) in bucket.items():
+                        (col, row) = center
+                        if left <= col <= right and top <= row <= bottom:
+                            found.append((userID, center, radius))
+            for userID, (center, radius) in self.__oversized.items():
+                (col, row) = center
+                if left <= col <= right and top <= row <= bottom:
+                    found.append((userID, center, radius))
+        return found
+
+    def queryRadius(self, centerPosition, radius):
+        """ Get (userID, center, radius) of players centered strictly
+            within radius of a position
+        """
+        (centerCol, centerRow) = centerPosition
+        candidates = self.queryRect(centerCol - radius, centerRow - radius,
+                                    centerCol + radius, centerRow + radius)
+        return [(userID, center, otherRadius)
+                    for (userID, center, otherRadius) in candidates
+                    if (center[0] - centerCol) ** 2 +
+                       (center[1] - centerRow) ** 2 < radius ** 2]
+
+    def queryOverlapping(self, centerPosition, radius):
+        """ Get (userID, center, radius) of players whose circle
+            overlaps a circle
+        """
+        (centerCol, centerRow) = centerPosition
+        with self.__mutex:
+            oversized = list(self.__oversized.items())
+            reach = radius + self.__bucketRadius
+
+        """ Oversized players are always candidates, so the rect only
+            needs to reach the players in buckets
+        """
+        candidates = [(userID, center, otherRadius)
+                        for (userID, center, otherRadius) in self.queryRect(
+                                centerCol - reach, centerRow - reach,
+                                centerCol + reach, centerRow + reach)
+                        if otherRadius <= self.__cellSize]
+        candidates.extend((userID, center, otherRadius)
+                            for userID, (center, otherRadius) in oversized)
+        return [(userID, center, otherRadius)
+                    for (userID, center, otherRadius) in candidates
+                    if (center[0] - centerCol) ** 2 +
+                       (center[1] - centerRow) ** 2 < 
+                       (radius + otherRadius) ** 2]
+
+    def queryNearest(   self, 
+                        centerPosition, 
+                        count       = 1, 
+                        maxDistance = None, 
+                        accept      = None):
+        """ Get (userID, center, radius) of the count players centered
+            nearest to a position, nearest first. Only players within
+            maxDistance and for which accept(userID, center, radius) is
+            true are returned
+        """
+        return queryNearest(self, centerPosition, count, maxDistance,
+                            accept, self.__cellSize)
+
+    ##########################   SETTERS   ##########################
+
+    def insert(self, userID, centerPosition, radius):
+        """ Add a player to the index """
+        with self.__mutex:
+            self._removeEntry(userID)
+            self._addEntry(userID, centerPosition, radius)
+
+    def move(self, userID, centerPosition, radius):
+        """ Update the position and radius of a player """
+        self.insert(userID, centerPosition, radius)
+
+    def remove(self, userID):
+        """ Remove a player from the index """
+        with self.__mutex:
+            self._removeEntry(userID)
+
+    #########################   PROTECTED   #########################
+
+    def _getBucket(self, centerPosition):
+        (col, row) = centerPosition
+        return (int(col // self.__cellSize), int(row // self.__cellSize))
+
+    def _addEntry(self, userID, centerPosition, radius):
+        """ Add an entry. Must hold mutex """
+        if radius > self.__cellSize:
+            self.__oversized[userID] = (centerPosition, radius)
+            self.__entries[userID] = (None, centerPosition, radius)
+            return
+
+        self.__bucketRadius = max(self.__bucketRadius, radius)
+        bucket = self._getBucket(centerPosition)
+        self.__buckets.setdefault(bucket, dict())[userID] = \
+                                                (centerPosition, radius)
+        self.__entries[userID] = (bucket, centerPosition, radius)
+
+    def _removeEntry(self, userID):
+        """ Remove an entry if it exists. Must hold mutex """
+        entry = self.__entries.pop(userID, None)
+        if entry is None:
+            return
+
+        if entry[0] is None:
+            del self.__oversized[userID]
+            return
+
+        bucket = self.__buckets[entry[0]]
+        del bucket[userID]
+        if not bucket:
+            del self.__buckets[entry[0]]
+
+
+###############################################################################
+##
+##                              LooseQuadtree class
+##
+###############################################################################
+class LooseQuadtree(object):
+    """A loose quadtree holding the bounding circle of every player.
+
+    Level 0 is a single node covering the board and each level below
+    splits every node in four. A player is stored in the deepest level
+    whose nodes are at least as wide as its diameter, in the node that 
+    holds its center. The bounds of a node are loosened by half its size
+    on every side, so the player always fits inside. Small food sits in
+    small nodes and a huge player in a big one, so neither makes queries
+    for the other slow as it would in a grid with a single bucket size.
+
+    Nodes are kept in a map per level, which finds the node of a player
+    without walking down the tree. A query visits only the levels that
+    hold players, and on each level only the nodes near the area.
+
+    Attributes:
+        size: The width and height of the root node
+        depth: The number of levels below the root
+        nodeSizes: The width and height of a node on each level
+        levels: Map of (col, row) of a node to {userID: (center, radius)}
+            for each level
+        levelRadius: The largest radius inserted on each level
+        entries: Map of userID to (level, node, center, radius)
+        maxRadius: The largest radius that has been inserted
+        mutex: Controls atomic access to the levels and entries
+    """
+
+    def __init__(   self, 
+                    width       = 700, 
+                    height      = 700, 
+                    minNodeSize = 2 * InitialUserRadius.FOOD):
+        self.__size         = max(width, height, 1)
+        self.__depth        = max((self.__size // minNodeSize).bit_length()
+                                    - 1, 0)
+        self.__nodeSizes    = [float(self.__size) / 2 ** level 
+                                    for level in range(self.__depth + 1)]
+        self.__levels       = [dict() for level in self.__nodeSizes]
+        self.__levelRadius  = [0] * len(self.__nodeSizes)
+        self.__entries      = dict()
+        self.__maxRadius    = 0
+        self.__mutex        = threading.Lock()
+
+    ##########################   GETTERS   ##########################
+
+    def getDepth(self):
+        return self.__depth
+
+    def getMaxRadius(self):
+        return self.__maxRadius
+
+    def getEntry(self, userID):
+        """ Get the (center, radius) of a player or None """
+        with self.__mutex:
+            entry = self.__entries.get(userID)
+
+        if entry is None:
+            return None
+        return entry[2], entry[3]
+
+    def getLevelCounts(self):
+        """ Number of players stored on each level """
+        with self.__mutex:
+            return [sum(len(node) for node in nodes.values())
+                        for nodes in self.__levels]
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def queryRect(self, left, top, right, bottom):
+        """ Get (userID, center, radius) of players centered in a rect """
+        found = []
+        with self.__mutex:
+            for (level, node) in self._getNodesNear(
+                                    left, top, right, bottom, 0):
+                for userID, (center, radius) in node.items():
+                    (col, row) = center
+                    if left <= col <= right and top <= row <= bottom:
+                        found.append((userID, center, radius))
+        return found
+
+    def queryRadius(self, centerPosition, radius):
+        """ Get (userID, center, radius) of players centered strictly
+            within radius of a position
+        """
+        (centerCol, centerRow) = centerPosition
+        candidates = self.queryRect(centerCol - radius, centerRow - radius,
+                                    centerCol + radius, centerRow + radius)
+        return [(userID, center, otherRadius)
+                    for (userID, center, otherRadius) in candidates
+                    if (center[0] - centerCol) ** 2 +
+                       (center[1] - centerRow) ** 2 < radius ** 2]
+
+    def queryOverlapping(self, centerPosition, radius):
+        """ Get (userID, center, radius) of players whose circle
+            overlaps a circle. Each level is searched with its own 
+            largest radius, so small players are found cheaply even
+            when a huge one is on the board
+        """
+        (centerCol, centerRow) = centerPosition
+        found = []
+        with self.__mutex:
+            for (level, node) in self._getNodesNear(
+                                    centerCol - radius, centerRow - radius,
+                                    centerCol + radius, centerRow + radius,
+                                    None):
+                for userID, (center, otherRadius) in node.items():
+                    if (center[0] - centerCol) ** 2 + \
+                       (center[1] - centerRow) ** 2 < \
+                       (radius + otherRadius) ** 2:
+                        found.append((userID, center, otherRadius))
+        return found
+
+    def queryNearest(   self, 
+                        centerPosition, 
+                        count       = 1, 
+                        maxDistance = None, 
+                        accept      = None):
+        """ Get (userID, center, radius) of the count players centered
+            nearest to a position, nearest first. Only players within
+            maxDistance and for which accept(userID, center, radius) is
+            true are returned. The search starts at the size of the 
+            smallest nodes
+        """
+        return queryNearest(self, centerPosition, count, maxDistance,
+                            accept, self.__nodeSizes[-1])
+
+    ##########################   SETTERS   ##########################
+
+    def insert(self, userID, centerPosition, radius):
+        """ Add a player to the index """
+        with self.__mutex:
+            self._removeEntry(userID)
+            self._addEntry(userID, centerPosition, radius)
+
+    def move(self, userID, centerPosition, radius):
+        """ Update the position and radius of a player. A player that
+            stays in its node is updated in place
+        """
+        level = self._getLevel(radius)
+        node = self._getNode(level, centerPosition)
+        with self.__mutex:
+            entry = self.__entries.get(userID)
+            if entry is None or entry[0] != level or entry[1] != node:
+                self._removeEntry(userID)
+                self._addEntry(userID, centerPosition, radius)
+                return
+
+            self.__levels[level][node][userID] = (centerPosition, radius)
+            self.__entries[userID] = (level, node, centerPosition, radius)
+            if radius > self.__levelRadius[level]:
+                self.__levelRadius[level] = radius
+                self.__maxRadius = max(self.__maxRadius, radius)
+
+    def remove(self, userID):
+        """ Remove a player from the index """
+        with self.__mutex:
+            self._removeEntry(userID)
+
+    #########################   PROTECTED   #########################
+
+    def _getLevel(self, radius):
+        """ Deepest level whose nodes are at least as wide as a circle """
+        if radius <= 0:
+            return self.__depth
+        fits = int(self.__size // (2 * radius))
+        return min(max(fits.bit_length() - 1, 0), self.__depth)
+
+    def _getNode(self, level, centerPosition):
+        (col, row) = centerPosition
+        nodeSize = self.__nodeSizes[level]
+        return (int(col // nodeSize), int(row // nodeSize))
+
+    def _getNodesNear(self, left, top, right, bottom, reach):
+        """ Yield (level, node) for every node that may hold a player 
+            reaching into a rect. If reach is None the largest radius of
+            each level is used. Must hold mutex
+        """
+        for (level, nodes) in enumerate(self.__levels):
+            if not nodes:
+                continue
+            margin = self.__levelRadius[level] if reach is None else reach
+            (firstCol, firstRow) = self._getNode(
+                                level, (left - margin, top - margin))
+            (lastCol, lastRow) = self._getNode(
+                                level, (right + margin, bottom + margin))
+
+            if (lastCol - firstCol + 1) * (lastRow - firstRow + 1) > \
+                    len(nodes):
+                """ Fewer nodes in use than nodes in the rect """
+                for ((col, row), node) in nodes.items():
+                    if firstCol <= col <= lastCol and \
+                       firstRow <= row <= lastRow:
+                        yield level, node
+                continue
+
+            for col in range(firstCol, lastCol + 1):
+                for row in range(firstRow, lastRow + 1):
+                    node = nodes.get((col, row))
+                    if node:
+                        yield level, node
+
+    def _addEntry(self, userID, centerPosition, radius):
+        """ Add an entry. Must hold mutex """
+        level = self._getLevel(radius)
+        node = self._getNode(level, centerPosition)
+        self.__levels[level].setdefault(node, dict())[userID] = \
+                                                (centerPosition, radius)
+        self.__entries[userID] = (level, node, centerPosition, radius)
+        if radius > self.__levelRadius[level]:
+            self.__levelRadius[level] = radius
+            self.__maxRadius = max(self.__maxRadius, radius)
+
+    def _removeEntry(self, userID):
+        """ Remove an entry if it exists. Must hold mutex """
+        entry = self.__entries.pop(userID, None)
+        if entry is None:
+            return
+
+        (level, node) = entry[0], entry[1]
+        nodes = self.__levels[level]
+        del nodes[node][userID]
+        if not nodes[node]:
+            del nodes[node]
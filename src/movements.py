@@ -7,9 +7,9 @@
 #
 #   List of movement classes:
 #       Circle_
+#       WorldCircle_
 
 import threading
-import pygame
 from enums import Direction, Color
 
 ###############################################################################
@@ -20,30 +20,27 @@ from enums import Direction, Color
 class Circle_(object):
     """A circular blob.
 
+    Circles use slots instead of a dict per instance, since there may 
+    be a great many of them. The direction is a single value that is
+    read and replaced whole, so it needs no lock of its own.
+
     Attributes:
         center: The center of the circle.
         radius: The radius of the circle.
         positionMutex: Controls atomic access to center and radius variables
         direction: The current direction of the circle
-        directionMutex: Controls atomic access to direction variable
-        directions: Map of directions to movement methods
+        DIRECTIONS: Map of directions to the movement method, shared by
+            every circle. The functions are stored, so moving costs no
+            lookup by name
     """
 
+    __slots__ = ("__center", "__radius", "__positionMutex", "__direction")
+
     def __init__(self, initialCenter, initialRadius = 1):
         self.__center           = initialCenter
         self.__radius           = initialRadius
         self.__positionMutex    = threading.Lock()
         self.__direction        = Direction.STAY
-        self.__directionMutex   = threading.Lock()
-
-        self.__directions       = dict(
-            {
-                Direction.LEFT  : self._goLeft,
-                Direction.RIGHT : self._goRight,
-                Direction.UP    : self._goUp,
-                Direction.DOWN  : self._goDown,
-                Direction.STAY  : self._stayInPlace
-            })
 
 
     ##########################   GETTERS   ##########################
@@ -59,16 +56,13 @@ class Circle_(object):
         return radius
 
     def getCurrentDirection(self):
-        with self.__directionMutex:
-            direction = self.__direction
-        return direction
+        return self.__direction
 
     #------------------------- END PAGE 1 --------------------------#
     ##########################   SETTERS   ##########################
 
     def setCurrentDirection(self, direction):
-        with self.__directionMutex:
-            self.__direction = direction
+        self.__direction = direction
 
     def holdPosition(self):
         self.__positionMutex.acquire()
@@ -79,9 +73,22 @@ class Circle_(object):
 
     def move(self, user, game):
         """ Move the user in the directio they are facing """
-        self.__directions[self.getCurrentDirection()](
-                                    game.getGameboard(), user)
-        self._checkCollisions(game, user)
+        self.DIRECTIONS[self.getCurrentDirection()](
+                                    self, game.getGameboard(), user)
+        self.checkCollisions(game, user)
+
+    def checkCollisions(self, game, user):
+        """ Ask the board for players centered within the player's 
+            radius and check for a collision 
+        """
+        gameboard = game.getGameboard()
+        nearbyPlayers = gameboard.getPlayersNear(
+                                self.getCenter(), 
+                                self.getRadius())
+        for (otherUserID, otherCenter, otherRadius) in nearbyPlayers:
+            if otherUserID != user.getID():
+                self._handleCollisions(game, user, otherUserID)
+                return
 
     def setCenter(self, newCenter):
         with self.__positionMutex:
@@ -92,15 +99,35 @@ class Circle_(object):
         with self.__positionMutex:
             self.__radius += radiusIncrease
 
-    def draw(self, color):  
-        pygame.draw.circle(
-            pygame.display.get_surface(), 
-            color, 
-            self.__center, 
-            self.__radius)
+    def reset(self, center, radius):
+        """ Reuse the circle as if it was just created. Waits for anyone
+            holding the position to release it
+        """
+        with self.__positionMutex:
+            self.__center       = center
+            self.__radius       = radius
+            self.__direction    = Direction.STAY
+
+    def draw(self, color, circleCache = None, offset = (0, 0)):  
+        self._drawAt(self.__center, self.__radius, color, circleCache, offset)
 
     #########################   PROTECTED   #########################
 
+    def _drawAt(self, center, radius, color, circleCache, offset):
+        """ Blit a pre-rendered circle if a cache is given. 
+            Otherwise draw the circle. The offset is the board position
+            at the top left of the screen
+        """
+        import pygame
+        surface = pygame.display.get_surface()
+        (col, row) = (center[0] - offset[0], center[1] - offset[1])
+        if circleCache is None:
+            pygame.draw.circle(surface, color, (col, row), radius)
+            return
+
+        surface.blit(circleCache.getCircle(radius, color), 
+                     (col - radius, row - radius))
+
     def _goLeft(self, gameboard, user):
         """ Move left """
         (col, row) = self.getCenter()
@@ -142,23 +169,13 @@ class Circle_(object):
         """ Stay in place """
         return
 
-    def _checkCollisions(self, game, user):
-        """ Go through all pixels within player's radius and 
-            check for a collision 
-        """
-        gameboard = game.getGameboard()
-        (centerCol, centerRow) = self.getCenter()
-        radius = self.getRadius()
-        (width, height) = gameboard.getDimensions()
-        for col in range(max(0, centerCol - radius), 
-                         min(height, centerCol + radius)):
-            for row in range(max(0, centerRow - radius), 
-                             min(width, centerRow + radius)):
-                if gameboard.getLockAtPosition((col,row)).locked() \
-                        and (col, row) != (centerCol, centerRow):
-                    otherUserID = gameboard.getPlayerAtPosition((col, row))
-                    self._handleCollisions(game, user, otherUserID)
-                    return
+    DIRECTIONS = {
+        Direction.LEFT  : _goLeft,
+        Direction.RIGHT : _goRight,
+        Direction.UP    : _goUp,
+        Direction.DOWN  : _goDown,
+        Direction.STAY  : _stayInPlace
+    }
 
     def _handleCollisions(self, game, currentUser, otherUserID):
         """ Kill the smaller blob and increase the size of larger blob """
@@ -186,4 +203,67 @@ class Circle_(object):
         userToLive.increaseRadiusByN(radius)
         game.killUserWithID(userToKill.getID())
 
-        userToKill.releasePosition()
\ No newline at end of file
+        userToKill.releasePosition()
+
+
+###############################################################################
+##
+##                              WorldCircle_ class
+##
+###############################################################################
+class WorldCircle_(Circle_):
+    """A circular blob whose center, radius and direction live in a World.
+
+    Reads and writes go straight to the world arrays without a lock. A
+    world is advanced by a single thread, so there is never a position
+    to hold while a collision is handled.
+
+    Attributes:
+        world: The World holding the state of the circle
+        slot: The slot of the circle in the world
+    """
+
+    __slots__ = ("__world", "__slot")
+
+    def __init__(self, world, slot):
+        Circle_.__init__(self, world.getCenter(slot), world.getRadius(slot))
+        self.__world    = world
+        self.__slot     = slot
+
+    ##########################   GETTERS   ##########################
+
+    def getWorld(self):
+        return self.__world
+
+    def getSlot(self):
+        return self.__slot
+
+    def getCenter(self):
+        return self.__world.getCenter(self.__slot)
+
+    def getRadius(self):
+        return self.__world.getRadius(self.__slot)
+
+    def getCurrentDirection(self):
+        return self.__world.getDirection(self.__slot)
+
+    ##########################   SETTERS   ##########################
+
+    def setCurrentDirection(self, direction):
+        self.__world.setDirection(self.__slot, direction)
+
+    def holdPosition(self):
+        return self.getCenter(), self.getRadius()
+
+    def releasePosition(self):
+        return
+
+    def setCenter(self, newCenter):
+        self.__world.setCenter(self.__slot, newCenter)
+
+    def increaseRadiusByN(self, radiusIncrease):
+        self.__world.increaseRadius(self.__slot, radiusIncrease)
+
+    def draw(self, color, circleCache = None, offset = (0, 0)):
+        self._drawAt(self.getCenter(), self.getRadius(), color, 
+                     circleCache, offset)
\ No newline at end of file
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+#   pools.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of pool classes:
+#       UserPool
+
+import threading
+
+###############################################################################
+##
+##                              UserPool class
+##
+###############################################################################
+class UserPool(object):
+    """A free list of users that have been eaten and left the board.
+
+    Creating a user allocates a blob, a circle, a lock and an event. When
+    thousands of users are eaten and respawned a minute, reusing them 
+    keeps the game from spending its time allocating and collecting.
+    Only passive users (food) are kept, since they have no threads that
+    may still be running. A user is reset in place when it is reused,
+    so releasing one costs nothing.
+
+    Attributes:
+        maxSize: The most users kept of each type
+        freeUsers: Map of user type to the users that can be reused
+        reusedCount: The number of users handed out again
+        mutex: Controls atomic access to freeUsers
+    """
+
+    def __init__(self, maxSize = 1024):
+        self.__maxSize      = maxSize
+        self.__freeUsers    = dict()
+        self.__reusedCount  = 0
+        self.__mutex        = threading.Lock()
+
+    ##########################   GETTERS   ##########################
+
+    def getMaxSize(self):
+        return self.__maxSize
+
+    def getReusedCount(self):
+        return self.__reusedCount
+
+    def __len__(self):
+        with self.__mutex:
+            return sum(len(users) for users in self.__freeUsers.values())
+
+    ##########################   SETTERS   ##########################
+
+    def release(self, user):
+        """ Keep a user that has left the board for reuse """
+        if not user.isPassive():
+            return
+
+        with self.__mutex:
+            users = self.__freeUsers.setdefault(type(user), [])
+            if len(users) < self.__maxSize:
+                users.append(user)
+
+    def acquire(self, userType, id_, initialCenter):
+        """ Get a user of a type reset as if it was just created, 
+            or None if there is none to reuse
+        """
+        with self.__mutex:
+            users = self.__freeUsers.get(userType)
+            if not users:
+                return None
+            user = users.pop()
+            self.__reusedCount += 1
+
+        user.reset(id_, initialCenter)
+        return user
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+
+#   registries.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of registry classes:
+#       UserRegistry
+
+import threading
+from users import Human, Food
+
+###############################################################################
+##
+##                              UserRegistry class
+##
+###############################################################################
+class UserRegistry(object):
+    """A thread-safe registry of the users in a game.
+
+    Users are indexed by id so lookups and removals take constant time.
+    Readers that need to iterate over every user (such as the drawing
+    thread) are handed an immutable snapshot. The snapshot is only rebuilt
+    after the registry has changed, so iterating never blocks writers.
+
+    Attributes:
+        users: Map of userID to user, in the order they were added
+        humans: Map of userID to Human users
+        food: Map of userID to Food users
+        ai: Map of userID to AI users (not including food)
+        snapshot: Tuple of all users, or None if it must be rebuilt
+        mutex: Controls atomic access to the maps and snapshot
+    """
+
+    def __init__(self):
+        self.__users    = dict()
+        self.__humans   = dict()
+        self.__food     = dict()
+        self.__ai       = dict()
+        self.__snapshot = tuple()
+        self.__mutex    = threading.Lock()
+
+    ##########################   GETTERS   ##########################
+
+    def getUser(self, userID):
+        """ raises StopIteration if userID not found """
+        try:
+            return self.__users[userID]
+        except KeyError:
+            raise StopIteration(userID)
+
+    def hasUser(self, userID):
+        return userID in self.__users
+
+    def getSnapshot(self):
+        """ Get a tuple of all users that is safe to iterate over """
+        snapshot = self.__snapshot
+        if snapshot is None:
+            with self.__mutex:
+                if self.__snapshot is None:
+                    self.__snapshot = tuple(self.__users.values())
+                snapshot = self.__snapshot
+        return snapshot
+
+    def getHumans(self):
+        with self.__mutex:
+            return tuple(self.__humans.values())
+
+    def getFood(self):
+        with self.__mutex:
+            return tuple(self.__food.values())
+
+    def getFoodCount(self):
+        return len(self.__food)
+
+    def getAI(self):
+        with self.__mutex:
+            return tuple(self.__ai.values())
+
+    def __len__(self):
+        return len(self.__users)
+
+    ##########################   SETTERS   ##########################
+
+    def addUser(self, user):
+        """ Add a user. Replaces any user with the same id """
+        with self.__mutex:
+            self._removeUser(user.getID())
+            self.__users[user.getID()] = user
+            self._getTypeIndex(user)[user.getID()] = user
+            self.__snapshot = None
+
+    def addUsers(self, users):
+        """ Add many users at once. The snapshot is only rebuilt once """
+        with self.__mutex:
+            for user in users:
+                self._removeUser(user.getID())
+                self.__users[user.getID()] = user
+                self._getTypeIndex(user)[user.getID()] = user
+            self.__snapshot = None
+
+    def removeUser(self, userID):
+        """ Remove a user and return it.
+            raises StopIteration if userID not found
+        """
+        with self.__mutex:
+            user = self._removeUser(userID)
+
+        if user is None:
+            raise StopIteration(userID)
+        return user
+
+    #########################   PROTECTED   #########################
+
+    def _getTypeIndex(self, user):
+        """ Sub-index that a user belongs to """
+        if isinstance(user, Human):
+            return self.__humans
+        if isinstance(user, Food):
+            return self.__food
+        return self.__ai
+
+    def _removeUser(self, userID):
+        """ Remove a user if it exists. Must hold mutex """
+        user = self.__users.pop(userID, None)
+        if user is not None:
+            del self._getTypeIndex(user)[userID]
+            self.__snapshot = None
+        return user
@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+
+#   renderers.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of renderer classes:
+#       FullRenderer
+#       DirtyRectRenderer
+#       BlobSprite
+#       OverlaySprite
+#       CircleCache
+#       FrameScheduler
+
+import pygame
+from caches import LRUCache
+from enums import FrameRate
+from huds import Hud
+
+## Color that is never drawn, used for the transparent corners of a blob
+COLORKEY = (255, 0, 255)
+
+## The most pre-rendered circles kept at once
+CIRCLE_CACHE_SIZE = 256
+
+###############################################################################
+##
+##                              FullRenderer class
+##
+###############################################################################
+class FullRenderer(object):
+    """ Redraws the whole board every frame. This is the default renderer 
+
+    Attributes:
+        hud: The heads-up display drawn over the users
+        circleCache: Pre-rendered circles that users are blitted with
+    """
+
+    def __init__(self, hud = None, circleCache = None):
+        self.__hud          = hud if hud is not None else Hud()
+        self.__circleCache  = circleCache if circleCache is not None \
+                                else CircleCache()
+
+    def getHud(self):
+        return self.__hud
+
+    def getCircleCache(self):
+        return self.__circleCache
+
+    def draw(self, game):
+        """ Draw the gameboard with the users on screen and the HUD """
+        gameboard = game.getGameboard()
+        gameboard.updateBackground()
+
+        game.followHuman()
+        offset = gameboard.getCamera().getOffset()
+        for user in game.getUsersInView():
+            user.draw(self.__circleCache, offset)
+
+        self.__hud.draw(gameboard.getDisplay(), game)
+        gameboard.updateDisplay()
+
+
+###############################################################################
+##
+##                              DirtyRectRenderer class
+##
+###############################################################################
+class DirtyRectRenderer(object):
+    """Only redraws the parts of the board that changed.
+
+    Every user is drawn by a sprite that is marked dirty when its user
+    moves or grows. Each frame only the old and new bounding boxes of
+    dirty sprites are erased, redrawn and sent to the display, so the
+    cost of a frame follows the area that moved instead of the board.
+    Users off screen have no sprite. When the camera scrolls, every 
+    sprite on screen moves and is redrawn.
+
+    Attributes:
+        hud: The heads-up display drawn over the users
+        circleCache: Pre-rendered circles shared by the sprites
+        group: pygame LayeredDirty group holding every sprite
+        sprites: Map of user to the sprite drawing it
+        overlays: Sprites showing each overlay of the HUD
+    """
+
+    def __init__(self, hud = None, circleCache = None):
+        self.__hud          = hud if hud is not None else Hud()
+        self.__circleCache  = circleCache if circleCache is not None \
+                                else CircleCache()
+        self.__group        = None
+        self.__sprites      = dict()
+        self.__overlays     = []
+
+    def getHud(self):
+        return self.__hud
+
+    def getCircleCache(self):
+        return self.__circleCache
+
+    def draw(self, game):
+        """ Redraw the sprites that changed since the last frame """
+        gameboard = game.getGameboard()
+        if self.__group is None:
+            self._initializeGroup(gameboard)
+
+        game.followHuman()
+        camera = gameboard.getCamera()
+        offset = camera.getOffset()
+
+        users = game.getUsersInView()
+        for user in users:
+            sprite = self.__sprites.get(user)
+            if sprite is None:
+                sprite = self.__sprites[user] = BlobSprite(
+                                                    user, self.__circleCache)
+                self.__group.add(sprite)
+            sprite.update(offset)
+
+        if len(self.__sprites) != len(users) or \
+                not camera.showsWholeBoard():
+            self._removeHiddenSprites(users)
+
+        for overlay in self.__overlays:
+            overlay.update(game)
+
+        rects = self.__group.draw(gameboard.getDisplay())
+        gameboard.updateDisplay(rects)
+
+    #########################   PROTECTED   #########################
+
+    def _initializeGroup(self, gameboard):
+        """ Create the sprite group. The background is used to erase """
+        self.__group = pygame.sprite.LayeredDirty()
+        self.__group.clear(gameboard.getDisplay(), gameboard.getBackground())
+
+        for overlay in self.__hud.getOverlays():
+            sprite = OverlaySprite(self.__hud, overlay)
+            self.__overlays.append(sprite)
+            self.__group.add(sprite, layer = 1)
+
+    def _removeHiddenSprites(self, users):
+        """ Remove the sprites of users that are no longer in the game
+            or on screen. The group erases their last position on the 
+            next draw
+        """
+        alive = set(users)
+        for user in list(self.__sprites):
+            if user not in alive:
+                self.__sprites.pop(user).kill()
+
+
+###############################################################################
+##
+##                              BlobSprite class
+##
+###############################################################################
+class BlobSprite(pygame.sprite.DirtySprite):
+    """A sprite that draws a user as a circle.
+
+    Attributes:
+        user: The user being drawn
+        circleCache: Pre-rendered circles the image is taken from
+        center: The screen position the sprite was last drawn at
+        radius: The radius the sprite was last drawn with
+    """
+
+    def __init__(self, user, circleCache):
+        pygame.sprite.DirtySprite.__init__(self)
+        self.__user         = user
+        self.__circleCache  = circleCache
+        self.__center       = None
+        self.__radius       = None
+        self.update()
+
+    def update(self, offset = (0, 0)):
+        """ Mark the sprite dirty if its user moved (on screen) or 
+            changed size. The offset is the board position at the top 
+            left of the screen
+        """
+        (col, row) = self.__user.getCenter()
+        center = (col - offset[0], row - offset[1])
+        radius = self.__user.getRadius()
+        if center == self.__center and radius == self.__radius:
+            return
+
+        if radius != self.__radius:
+            self.image = self.__circleCache.getCircle(
+                                    radius, self.__user.getColor())
+
+        self.rect       = self.image.get_rect(center = center)
+        self.dirty      = 1
+        self.__center   = center
+        self.__radius   = radius
+
+
+###############################################################################
+##
+##                              OverlaySprite class
+##
+###############################################################################
+class OverlaySprite(pygame.sprite.DirtySprite):
+    """A sprite that draws one overlay of a HUD.
+
+    Attributes:
+        hud: The HUD that renders the overlay
+        overlay: The overlay being drawn
+        text: The text currently shown
+    """
+
+    def __init__(self, hud, overlay):
+        pygame.sprite.DirtySprite.__init__(self)
+        self.__hud      = hud
+        self.__overlay  = overlay
+        self.__text     = None
+        self.image      = pygame.Surface((0, 0))
+        self.rect       = self.image.get_rect()
+
+    def update(self, game):
+        """ Mark the sprite dirty if the text of the overlay changed """
+        text = self.__overlay.getText(game)
+        if text == self.__text:
+            return
+
+        (self.image, self.rect) = self.__hud.renderOverlay(
+                                            self.__overlay, text)
+        self.dirty  = 1
+        self.__text = text
+
+
+###############################################################################
+##
+##                              CircleCache class
+##
+###############################################################################
+class CircleCache(object):
+    """Pre-rendered circle surfaces keyed by (radius, color).
+
+    Blitting a cached circle is much cheaper than rasterising it again,
+    and most blobs (all of the food) share a handful of sizes. The corners
+    of each surface are transparent through a colorkey. Sizes that have
+    not been drawn recently are evicted first.
+
+    Attributes:
+        circles: LRUCache of (radius, color) to surface
+    """
+
+    def __init__(self, maxSize = CIRCLE_CACHE_SIZE):
+        self.__circles = LRUCache(maxSize)
+
+    def getCircles(self):
+        return self.__circles
+
+    def getCircle(self, radius, color):
+        """ Get a (2 * radius + 1) square surface with a circle in it """
+        return self.__circles.get(
+                    (radius, color),
+                    lambda: self._renderCircle(radius, color))
+
+    #########################   PROTECTED   #########################
+
+    def _renderCircle(self, radius, color):
+        """ Draw a circle on its own surface """
+        image = pygame.Surface((2 * radius + 1, 2 * radius + 1)).convert()
+        image.fill(COLORKEY)
+        pygame.draw.circle(image, color, (radius, radius), radius)
+        image.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return image
+
+
+###############################################################################
+##
+##                              FrameScheduler class
+##
+###############################################################################
+class FrameScheduler(object):
+    """Paces the drawing loop to a target frame rate.
+
+    A frame is only drawn when the board or the clock changed since the
+    last one. pygame.time.Clock sleeps away the rest of each frame, so the
+    drawing thread leaves the processor to the users in between. When a
+    frame takes longer than its share of a second, the frames that would
+    have been late are skipped (up to maxFrameSkip in a row) instead of 
+    falling further behind.
+
+    Attributes:
+        framesPerSecond: The target frame rate
+        maxFrameSkip: The most frames that are skipped in a row
+        clock: pygame clock used to pace frames
+        lastState: The (board version, time remaining) last drawn
+        framesToSkip: The number of upcoming frames to skip
+        drawnFrames: The number of frames drawn
+        skippedFrames: The number of frames skipped under load
+    """
+
+    def __init__(   self,
+                    framesPerSecond = FrameRate.TARGET,
+                    maxFrameSkip    = FrameRate.MAXSKIP):
+        self.__framesPerSecond  = framesPerSecond
+        self.__maxFrameSkip     = maxFrameSkip
+        self.__clock            = None
+        self.__lastState        = None
+        self.__framesToSkip     = 0
+        self.__drawnFrames      = 0
+        self.__skippedFrames    = 0
+
+    ##########################   GETTERS   ##########################
+
+    def getFramesPerSecond(self):
+        """ The frame rate measured over the last few frames """
+        if self.__clock is None:
+            return 0.
+        return self.__clock.get_fps()
+
+    def getDrawnFrames(self):
+        return self.__drawnFrames
+
+    def getSkippedFrames(self):
+        return self.__skippedFrames
+
+    ##########################   RUNNING   ##########################
+
+    def run(self, game, renderer):
+        """ Draw frames until the game is over """
+        self.__clock = pygame.time.Clock()
+        gameOverFlag = game.getGameOverFlag()
+
+        while not gameOverFlag.is_set():
+            self.frame(game, renderer)
+            self.__clock.tick(self.__framesPerSecond)
+
+    def frame(self, game, renderer):
+        """ Draw a single frame if anything changed and it isn't skipped """
+        state = (game.getGameboard().getVersion(), game.getRemainingTime())
+        if state == self.__lastState:
+            return
+
+        if self.__framesToSkip:
+            self.__framesToSkip -= 1
+            self.__skippedFrames += 1
+            return
+
+        start = pygame.time.get_ticks()
+        renderer.draw(game)
+        self.__lastState = state
+        self.__drawnFrames += 1
+
+        elapsed = pygame.time.get_ticks() - start
+        frameLength = 1000. / self.__framesPerSecond
+        self.__framesToSkip = min(self.__maxFrameSkip, 
+                                  int(elapsed // frameLength))
\ No newline at end of file
@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+
+#   schedulers.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of scheduler classes:
+#       DecisionScheduler
+#       DetailScheduler
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+import numpy
+from decisions import AISmartInput
+from enums import Timeout
+
+## Longest a worker sleeps before checking whether it was stopped
+WORKER_POLL_INTERVAL = .1
+
+## AIs centered closer than this to the human or the visible board are
+## run at full detail
+DETAIL_NEAR_DISTANCE = 200
+
+###############################################################################
+##
+##                              DecisionScheduler class
+##
+###############################################################################
+class DecisionScheduler(object):
+    """Makes the decisions of many users with a fixed number of threads.
+
+    Every scheduled user waits in a priority queue keyed by the time of
+    its next decision. Workers pop the user that is due first, make its
+    decision and push it back one interval later. A user that has died
+    is dropped when it comes up. The number of threads doesn't depend on
+    the number of users, only on workerCount (the number of cores unless
+    tuned with `python benchmarks.py scheduler`). Given a DetailScheduler,
+    users far from the action wait longer between decisions. It is
+    updated by one worker at most once per decision interval of the human.
+
+    Smart AIs all steer towards the same human, so they aren't queued one
+    by one. The smart AIs of a game wait in a batch, with a single entry
+    in the queue. The worker that pops it reads the center of the human
+    once and turns every smart AI that is due towards it in one pass.
+
+    Attributes:
+        workerCount: The number of worker threads
+        detailScheduler: Slows down the decisions of distant users (or
+            None)
+        queue: Heap of (due time, sequence, user, game). The user is
+            None for the entry of a batch of smart AIs
+        smartBatches: Map of game to a list of (passes left, user) for
+            its smart AIs. A smart AI is turned on the pass that brings
+            its passes left to 0
+        sequence: Counter breaking ties between users due at once
+        condition: Guards the queue, and wakes workers when it changes
+        workers: The running worker threads
+        isStopped: Whether the workers were told to exit
+        decisionCount: The number of decisions made
+        lateness: Total seconds decisions were made after they were due
+        detailUpdatedAt: The time the detail scheduler was last updated
+    """
+
+    def __init__(self, workerCount = None, detailScheduler = None):
+        self.__workerCount      = workerCount or os.cpu_count() or 1
+        self.__detailScheduler  = detailScheduler
+        self.__queue            = []
+        self.__smartBatches     = dict()
+        self.__sequence         = itertools.count()
+        self.__condition        = threading.Condition()
+        self.__workers          = []
+        self.__isStopped        = False
+        self.__decisionCount    = 0
+        self.__lateness         = 0.
+        self.__detailUpdatedAt  = 0.
+
+    ##########################   GETTERS   ##########################
+
+    def getWorkerCount(self):
+        return self.__workerCount
+
+    def getDetailScheduler(self):
+        return self.__detailScheduler
+
+    def getDecisionCount(self):
+        return self.__decisionCount
+
+    def getAverageLateness(self):
+        """ Average seconds a decision was made after it was due """
+        if not self.__decisionCount:
+            return 0.
+        return self.__lateness / self.__decisionCount
+
+    def __len__(self):
+        """ The number of users waiting for a decision """
+        with self.__condition:
+            return len(self.__queue) - len(self.__smartBatches) + \
+                   sum(len(batch) for batch in self.__smartBatches.values())
+
+    ##########################   SETTERS   ##########################
+
+    def schedule(self, user, game):
+        """ Make decisions for a user until it dies. Its first decision
+            is one interval from now (on the next pass of the batch, for
+            a smart AI)
+        """
+        dueTime = time.time() + user.getDecisionInterval()
+        if type(user.getDecision()) is not AISmartInput:
+            self._push(dueTime, user, game)
+            return
+
+        with self.__condition:
+            batch = self.__smartBatches.get(game)
+            if batch is None:
+                batch = self.__smartBatches[game] = []
+                heapq.heappush(self.__queue,
+                               (dueTime, next(self.__sequence), None, game))
+                self.__condition.notify()
+            batch.append((1, user))
+
+    ##########################   RUNNING   ##########################
+
+    def start(self):
+        """ Start the workers """
+        with self.__condition:
+            self.__isStopped = False
+        for w in range(self.__workerCount):
+            worker = threading.Thread(target = self._work)
+            worker.start()
+            self.__workers.append(worker)
+
+    def stop(self):
+        """ Stop the workers and wait for them to exit. Users still in
+            the queue make no further decisions
+        """
+        with self.__condition:
+            self.__isStopped = True
+            self.__condition.notify_all()
+        for worker in self.__workers:
+            worker.join()
+        self.__workers = []
+
+    #########################   PROTECTED   #########################
+
+    def _push(self, dueTime, user, game):
+        with self.__condition:
+            heapq.heappush(self.__queue,
+                           (dueTime, next(self.__sequence), user, game))
+            self.__condition.notify()
+
+    def _popDue(self):
+        """ Wait for the next due user. None once the workers are stopped """
+        with self.__condition:
+            while not self.__isStopped:
+                if self.__queue:
+                    wait = self.__queue[0][0] - time.time()
+                    if wait <= 0:
+                        return heapq.heappop(self.__queue)
+                else:
+                    wait = WORKER_POLL_INTERVAL
+                self.__condition.wait(min(wait, WORKER_POLL_INTERVAL))
+        return None
+
+    def _work(self):
+        """ Make the decisions that are due until stopped """
+        while True:
+            due = self._popDue()
+            if due is None:
+                return
+
+            (dueTime, sequence, user, game) = due
+            if user is None:
+                self._steerSmartAIs(dueTime, game)
+                continue
+
+            if user.isDead().is_set():
+                user.stopDeciding(game)
+                continue
+
+            now = time.time()
+            user.makeDecision(game)
+            with self.__condition:
+                self.__decisionCount += 1
+                self.__lateness += now - dueTime
+
+            interval = user.getDecisionInterval()
+            detailScheduler = self.__detailScheduler
+            if detailScheduler is not None:
+                self._updateDetail(game, now)
+                interval *= detailScheduler.getSlowdown(user.getCenter())
+
+            """ Keep to the schedule, but skip decisions that were missed """
+            self._push(max(dueTime + interval, now), user, game)
+
+    def _updateDetail(self, game, now):
+        """ Update the detail scheduler if it wasn't updated within the
+            decision interval of the human. The worker that claims the
+            update makes it, so it is never written by two at once
+        """
+        with self.__condition:
+            if now - self.__detailUpdatedAt < Timeout.DECISION:
+                return
+            self.__detailUpdatedAt = now
+        self.__detailScheduler.update(game)
+
+    def _steerSmartAIs(self, dueTime, game):
+        """ Make a pass over the batch of smart AIs of a game. The batch
+            has one entry in the queue, so only one worker makes a pass
+            at once. Smart AIs scheduled during the pass join the next
+        """
+        with self.__condition:
+            batch = self.__smartBatches[game]
+            self.__smartBatches[game] = []
+
+        now = time.time()
+        try:
+            humanCenter = game.getHumanUser().getCenter()
+        except StopIteration:
+            """ Human has been killed but not registered """
+            humanCenter = None
+
+        detailScheduler = self.__detailScheduler
+        if detailScheduler is not None:
+            self._updateDetail(game, now)
+
+        remaining = []
+        decisionCount = 0
+        for (passesLeft, user) in batch:
+            if user.isDead().is_set():
+                user.stopDeciding(game)
+                continue
+
+            passesLeft -= 1
+            if passesLeft <= 0:
+                if humanCenter is not None:
+                    user.getDecision().turnTowards(user.getMovement(),
+                                                   humanCenter)
+                decisionCount += 1
+                passesLeft = 1 if detailScheduler is None \
+                    else detailScheduler.getSlowdown(user.getCenter())
+            remaining.append((passesLeft, user))
+
+        """ Keep to the schedule, but skip passes that were missed """
+        interval = AISmartInput.DECISION_INTERVAL
+        with self.__condition:
+            self.__decisionCount += decisionCount
+            self.__lateness += decisionCount * (now - dueTime)
+            batch = self.__smartBatches[game]
+            batch.extend(remaining)
+            if not batch:
+                del self.__smartBatches[game]
+                return
+            heapq.heappush(self.__queue,
+                           (max(dueTime + interval, now),
+                            next(self.__sequence), None, game))
+            self.__condition.notify()
+
+
+###############################################################################
+##
+##                              DetailScheduler class
+##
+###############################################################################
+class DetailScheduler(object):
+    """Decides how much detail each AI is simulated with, from its
+    distance to the action.
+
+    An AI centered within nearDistance of the human or of the visible 
+    part of the board runs at full detail, with a slowdown of 1. Each
+    time the distance doubles past that, the slowdown doubles, up to
+    2 ** (levelCount - 1). Engines multiply the decision interval of an
+    AI by its slowdown. Only the VectorTickEngine also moves it less often
+    in longer jumps, whose whole path it checks for collisions.
+    Since slowdowns follow the last update, an AI that comes near is
+    back at full detail on its next decision. When the whole board is
+    shown, everything runs at full detail.
+
+    Attributes:
+        nearDistance: Distance within which AIs run at full detail
+        maxSlowdown: The slowdown of the most distant AIs
+        humanCenter: The center of the human at the last update (None
+            if there is no human)
+        viewport: The (left, top, right, bottom) of the visible board at
+            the last update (None if the whole board is shown)
+    """
+
+    def __init__(   self,
+                    nearDistance    = DETAIL_NEAR_DISTANCE,
+                    levelCount      = 4):
+        self.__nearDistance = nearDistance
+        self.__maxSlowdown  = 2 ** (levelCount - 1)
+        self.__humanCenter  = None
+        self.__viewport     = None
+
+    ##########################   GETTERS   ##########################
+
+    def getNearDistance(self):
+        return self.__nearDistance
+
+    def getMaxSlowdown(self):
+        return self.__maxSlowdown
+
+    def getSlowdown(self, centerPosition):
+        """ Get the slowdown of an AI centered at a position """
+        viewport = self.__viewport
+        if viewport is None:
+            return 1
+
+        (col, row) = centerPosition
+        (left, top, right, bottom) = viewport
+        distance = math.hypot(max(left - col, 0, col - right),
+                              max(top - row, 0, row - bottom))
+        if self.__humanCenter is not None:
+            (humanCol, humanRow) = self.__humanCenter
+            distance = min(distance,
+                           math.hypot(col - humanCol, row - humanRow))
+
+        slowdown = 1
+        bound = self.__nearDistance
+        while distance >= bound and slowdown < self.__maxSlowdown:
+            slowdown *= 2
+            bound *= 2
+        return slowdown
+
+    def getSlowdowns(self, cols, rows):
+        """ Get the slowdown of the AIs centered at each (col, row) of
+            two arrays at once
+        """
+        viewport = self.__viewport
+        if viewport is None:
+            return numpy.ones(len(cols), dtype = numpy.int32)
+
+        (left, top, right, bottom) = viewport
+        distances = numpy.hypot(
+                        numpy.maximum(numpy.maximum(left - cols, 0),
+                                      cols - right),
+                        numpy.maximum(numpy.maximum(top - rows, 0),
+                                      rows - bottom))
+        if self.__humanCenter is not None:
+            (humanCol, humanRow) = self.__humanCenter
+            distances = numpy.minimum(distances,
+                                      numpy.hypot(cols - humanCol,
+                                                  rows - humanRow))
+
+        """ Each doubling of the distance past nearDistance doubles the
+            slowdown
+        """
+        ratios = numpy.maximum(distances / self.__nearDistance, 1)
+        levels = numpy.floor(numpy.log2(ratios)).astype(numpy.int32) + \
+                 (distances >= self.__nearDistance)
+        return numpy.minimum(2 ** levels, self.__maxSlowdown)
+
+    ##########################   SETTERS   ##########################
+
+    def update(self, game):
+        """ Read the position of the human and of the visible board """
+        camera = game.getGameboard().getCamera()
+        try:
+            self.__humanCenter = game.getHumanUser().getCenter()
+        except StopIteration:
+            """ Human has been killed but not registered """
+            self.__humanCenter = None
+        self.__viewport = None if camera.showsWholeBoard() \
+                            else camera.getViewport()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+
+#   shards.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of shard classes:
+#       SharedArrays
+#       Shard
+
+import queue
+import time
+import numpy
+from multiprocessing import shared_memory
+from enums import Direction, Timeout
+from worlds import World
+
+## Kinds of blob, deciding what a shard does for them
+PASSIVE = 0     # Never moves (food)
+STEERED = 1     # Its direction is set by the main process (the human)
+SMART   = 2     # Moves towards the human
+RANDOM  = 3     # Moves in a random direction
+
+## Owner of a slot whose blob was eaten
+EATEN = -1
+
+## (name, dtype, initial value) of every shared array, largest items first
+## so that each array stays aligned
+LAYOUT = (
+    ("speed",       numpy.float64,  0),
+    ("clock",       numpy.float64,  0),
+    ("x",           numpy.int32,    0),
+    ("y",           numpy.int32,    0),
+    ("radius",      numpy.int32,    0),
+    ("generation",  numpy.int32,    0),
+    ("owner",       numpy.int16,    EATEN),
+    ("direction",   numpy.int8,     Direction.STAY),
+    ("kind",        numpy.int8,     PASSIVE),
+    ("alive",       bool,           False))
+
+## Direction of each choice of a random AI (0 keeps the current direction)
+RANDOM_DIRECTIONS = numpy.array((Direction.STAY, Direction.LEFT,
+                                 Direction.RIGHT, Direction.UP,
+                                 Direction.DOWN), dtype = numpy.int8)
+
+def getBand(rows, height, shardCount):
+    """ Get the band of a row (or of each row in an array) """
+    return numpy.minimum(rows * shardCount // (height + 1), shardCount - 1)
+
+
+###############################################################################
+##
+##                              SharedArrays class
+##
+###############################################################################
+class SharedArrays(object):
+    """The arrays of a World, in one block of shared memory.
+
+    The main process creates the block. Each shard process attaches to it
+    by name, so every process reads and writes the same blobs without
+    copying them. On top of the World arrays, owner holds the shard
+    simulating each blob (or EATEN), kind what the shard does with it and
+    generation how many times the slot has been given back, so a message
+    about a blob that died isn't applied to the next blob in its slot.
+
+    Attributes:
+        capacity: The number of slots in each array
+        memory: The SharedMemory block
+        arrays: Map of name to the array viewing its part of the block
+    """
+
+    def __init__(self, capacity, name = None):
+        sizes = [capacity * numpy.dtype(dtype).itemsize
+                    for (arrayName, dtype, value) in LAYOUT]
+        self.__capacity = capacity
+        if name is None:
+            self.__memory = shared_memory.SharedMemory(
+                                create = True, size = sum(sizes))
+        else:
+            self.__memory = shared_memory.SharedMemory(name = name)
+
+        self.__arrays = dict()
+        offset = 0
+        for ((arrayName, dtype, value), size) in zip(LAYOUT, sizes):
+            array = numpy.ndarray(capacity, dtype = dtype,
+                                  buffer = self.__memory.buf,
+                                  offset = offset)
+            if name is None:
+                array[:] = value
+            self.__arrays[arrayName] = array
+            offset += size
+
+    def getCapacity(self):
+        return self.__capacity
+
+    def getName(self):
+        return self.__memory.name
+
+    def getArrays(self):
+        return self.__arrays
+
+    def close(self, unlink = False):
+        """ Detach from the block. The creator also unlinks it """
+        self.__arrays = dict()
+        self.__memory.close()
+        if unlink:
+            self.__memory.unlink()
+
+
+###############################################################################
+##
+##                              Shard class
+##
+###############################################################################
+class Shard(object):
+    """One horizontal band of the board, simulated in its own process.
+
+    A shard makes the decisions of, moves and resolves the collisions of
+    the blobs it owns, using the World over the shared arrays. When one of
+    its blobs moves into another band, the blob is handed off by writing
+    the new shard into its owner slot. Collisions are found against the
+    blobs of neighbouring bands as well, and settled by the shard owning
+    the eater. If the eaten blob is owned by another shard, an "eat"
+    message is sent to its inbox. That shard checks that the pair still
+    overlaps before marking the blob EATEN, and sends the radius to grow
+    by back with a "grow" message. Messages carry the generation of both
+    slots, and are dropped if either slot has been given to a new blob
+    since. The main process takes EATEN blobs out of the game.
+
+    Attributes:
+        index: The band of this shard, counted from the top
+        shardCount: The number of bands
+        capacity: The number of slots in the shared arrays
+        memoryName: The name of the shared memory block
+        dimensions: The (width, height) of the board
+        humanSlot: The slot of the human, that smart AIs move towards
+        tickLength: Seconds between ticks
+        inboxes: A multiprocessing queue per shard
+        stopEvent: Set by the main process to stop every shard
+        seed: Seed or SeedSequence of the stream the random AIs of the
+            shard turn with
+    """
+
+    def __init__(   self,
+                    index,
+                    shardCount,
+                    capacity,
+                    memoryName,
+                    dimensions,
+                    humanSlot,
+                    inboxes,
+                    stopEvent,
+                    tickLength  = Timeout.TICK,
+                    seed        = None):
+        self.__index        = index
+        self.__shardCount   = shardCount
+        self.__capacity     = capacity
+        self.__memoryName   = memoryName
+        self.__dimensions   = dimensions
+        self.__humanSlot    = humanSlot
+        self.__inboxes      = inboxes
+        self.__stopEvent    = stopEvent
+        self.__tickLength   = tickLength
+        self.__seed         = seed
+
+    ##########################   GETTERS   ##########################
+
+    def getIndex(self):
+        return self.__index
+
+    ##########################   RUNNING   ##########################
+
+    def run(self):
+        """ Tick until the main process sets the stop event. This is the
+            target of the shard process
+        """
+        sharedArrays = SharedArrays(self.__capacity, self.__memoryName)
+        arrays = sharedArrays.getArrays()
+        world = World(self.__capacity, arrays)
+        random = numpy.random.default_rng(self.__seed)
+        decisionClock = 0.
+        nextTick = time.time()
+
+        while not self.__stopEvent.is_set():
+            self._readInbox(world, arrays)
+
+            decisionClock += self.__tickLength
+            if decisionClock >= Timeout.SLOWDECISION:
+                decisionClock -= Timeout.SLOWDECISION
+                self._decide(world, arrays, random)
+
+            self._move(world, arrays)
+            self._resolveCollisions(world, arrays)
+
+            nextTick += self.__tickLength
+            delay = nextTick - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                nextTick = time.time()
+
+        sharedArrays.close()
+
+    #########################   PROTECTED   #########################
+
+    def _getOwned(self, arrays):
+        """ Mask of the living blobs owned by this shard """
+        return arrays["alive"] & (arrays["owner"] == self.__index)
+
+    def _readInbox(self, world, arrays):
+        """ Handle the messages sent by the other shards """
+        inbox = self.__inboxes[self.__index]
+        (owner, generation) = (arrays["owner"], arrays["generation"])
+        while True:
+            try:
+                (message, eater, victim, generations, radiusIncrease) = \
+                    inbox.get_nowait()
+            except queue.Empty:
+                return
+
+            if message == "eat":
+                """ The victim may have moved away, died or been handed
+                    to another shard since the message was sent, and 
+                    either slot may hold a new blob
+                """
+                if (generation[eater], generation[victim]) != generations \
+                        or owner[victim] != self.__index \
+                        or not self._overlaps(arrays, eater, victim):
+                    continue
+                owner[victim] = EATEN
+                self._send(owner[eater], "grow", eater, victim, 
+                           generations, int(arrays["radius"][victim]))
+            elif generation[eater] != generations[0]:
+                """ The eater died and its slot was given back """
+                continue
+            elif owner[eater] == self.__index:
+                world.increaseRadius(eater, radiusIncrease)
+            else:
+                """ The eater was handed to another shard (or eaten)
+                    since it sent the "eat" message
+                """
+                self._send(owner[eater], "grow", eater, victim, 
+                           generations, radiusIncrease)
+
+    def _send(self, shard, message, eater, victim, generations, 
+              radiusIncrease):
+        """ generations: The (eater, victim) generation of the slots when
+            the collision was found
+        """
+        if shard != EATEN:
+            self.__inboxes[shard].put(
+                    (message, eater, victim, generations, radiusIncrease))
+
+    def _overlaps(self, arrays, first, second):
+        (x, y, radius) = (arrays["x"], arrays["y"], arrays["radius"])
+        distance = (int(x[first]) - int(x[second])) ** 2 + \
+                   (int(y[first]) - int(y[second])) ** 2
+        return distance < max(int(radius[first]), int(radius[second])) ** 2
+
+    def _decide(self, world, arrays, random):
+        """ Decide for every AI of the shard at once, as AISmartInput and
+            AIRandomInput would one at a time
+        """
+        owned = self._getOwned(arrays)
+        (kind, direction) = (arrays["kind"], arrays["direction"])
+
+        human = self.__humanSlot
+        smart = numpy.flatnonzero(owned & (kind == SMART))
+        if len(smart) and arrays["owner"][human] != EATEN:
+            world.steerTowards(smart, world.getCenter(human))
+
+        randomAIs = numpy.flatnonzero(owned & (kind == RANDOM))
+        if len(randomAIs):
+            choices = RANDOM_DIRECTIONS[
+                            random.integers(0, 5, len(randomAIs))]
+            turned = choices != Direction.STAY
+            direction[randomAIs[turned]] = choices[turned]
+
+    def _move(self, world, arrays):
+        """ Move the blobs of the shard, and hand off the ones that moved
+            into another band
+        """
+        (width, height) = self.__dimensions
+        (moved, oldCols, oldRows) = world.advance(
+                                        self.__tickLength, width, height,
+                                        self._getOwned(arrays))
+        if not len(moved):
+            return
+
+        bands = getBand(arrays["y"][moved], self.__dimensions[1],
+                        self.__shardCount)
+        leaving = bands != self.__index
+        arrays["owner"][moved[leaving]] = bands[leaving]
+
+    def _resolveCollisions(self, world, arrays):
+        """ Settle the collisions of the blobs owned by this shard """
+        (alive, owner, y) = (arrays["alive"], arrays["owner"], arrays["y"])
+        owned = self._getOwned(arrays)
+        if not owned.any():
+            return
+
+        """ Blobs of other bands close enough to touch one of ours """
+        reach = int(arrays["radius"][alive].max())
+        rows = y[owned]
+        near = alive & (owner != EATEN) & \
+               (y >= int(rows.min()) - 2 * reach) & \
+               (y <= int(rows.max()) + 2 * reach)
+
+        (kind, generation) = (arrays["kind"], arrays["generation"])
+        for (eater, victim, radiusIncrease) in world.findCollisions(
+                                                numpy.flatnonzero(near)):
+            if owner[eater] != self.__index or kind[eater] == PASSIVE:
+                continue
+            if owner[victim] == self.__index:
+                owner[victim] = EATEN
+                world.increaseRadius(eater, radiusIncrease)
+            else:
+                self._send(owner[victim], "eat", eater, victim,
+                           (int(generation[eater]), int(generation[victim])),
+                           0)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+#   spawners.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of spawner classes:
+#       FoodSpawner
+
+###############################################################################
+##
+##                              FoodSpawner class
+##
+###############################################################################
+class FoodSpawner(object):
+    """Keeps the board stocked with food while a game runs.
+
+    Food is added at a steady rate until maxFood items are on the board.
+    Tick engines call spawn on every tick. The threaded engine runs the 
+    spawner in a single thread of its own, since food has no threads.
+
+    Attributes:
+        respawnRate: The number of food items added per second
+        maxFood: The most food items on the board at once
+        interval: Seconds between spawns when run in its own thread
+        owed: Food earned by the time passed that is not spawned yet
+        spawnedCount: The number of food items spawned
+    """
+
+    def __init__(self, respawnRate = 10, maxFood = 100, interval = .1):
+        self.__respawnRate  = respawnRate
+        self.__maxFood      = maxFood
+        self.__interval     = interval
+        self.__owed         = 0.
+        self.__spawnedCount = 0
+
+    ##########################   GETTERS   ##########################
+
+    def getRespawnRate(self):
+        return self.__respawnRate
+
+    def getMaxFood(self):
+        return self.__maxFood
+
+    def getSpawnedCount(self):
+        return self.__spawnedCount
+
+    ##########################   RUNNING   ##########################
+
+    def run(self, game):
+        """ Spawn food at every interval until the game is over """
+        gameOverFlag = game.getGameOverFlag()
+        while not gameOverFlag.wait(timeout = self.__interval):
+            self.spawn(game, self.__interval)
+
+    def spawn(self, game, seconds):
+        """ Add the food earned over a number of seconds """
+        self.__owed += self.__respawnRate * seconds
+        room = self.__maxFood - game.getFoodCount()
+        if room <= 0:
+            """ Don't save up food while the board is full """
+            self.__owed = 0.
+            return
+
+        count = min(int(self.__owed), room)
+        if count:
+            self.__owed -= count
+            self.__spawnedCount += game.spawnFood(count)
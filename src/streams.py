@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+#   streams.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of random stream classes:
+#       RandomStreams
+#       ChoiceStream
+
+import os
+import random
+
+## Number of choices a ChoiceStream draws at once
+CHOICE_BLOCK_SIZE = 256
+
+###############################################################################
+##
+##                              RandomStreams class
+##
+###############################################################################
+class RandomStreams(object):
+    """Independent random streams derived from a single seed.
+
+    Every NumPy stream is spawned from one SeedSequence, so each AI (or
+    shard) gets a stream of its own that doesn't depend on how often the
+    others draw from theirs. The same seed spawns the same streams in the
+    same order, so a game can be replayed from its seed. NumPy is only
+    loaded when the first stream is spawned. The positions of new users
+    come from a stdlib Random seeded with the same seed, so a game
+    without random AIs never loads NumPy.
+
+    Attributes:
+        seed: The seed of the streams (drawn at random if none was given)
+        seedSequence: The SeedSequence every NumPy stream is spawned from
+            (None until the first one is spawned)
+    """
+
+    def __init__(self, seed = None):
+        self.__seed         = seed if seed is not None \
+                                else int.from_bytes(os.urandom(16), "big")
+        self.__seedSequence = None
+
+    def getSeed(self):
+        return self.__seed
+
+    def createPlacement(self):
+        """ Get the stdlib Random that positions new users """
+        return random.Random(self.__seed)
+
+    def spawnSeed(self):
+        """ Get the SeedSequence of a new stream. It can be sent to another
+            process to build the stream there
+        """
+        if self.__seedSequence is None:
+            import numpy
+            self.__seedSequence = numpy.random.SeedSequence(self.__seed)
+        return self.__seedSequence.spawn(1)[0]
+
+    def spawnGenerator(self):
+        """ Get a NumPy Generator for a new stream """
+        import numpy
+        return numpy.random.default_rng(self.spawnSeed())
+
+
+###############################################################################
+##
+##                              ChoiceStream class
+##
+###############################################################################
+class ChoiceStream(object):
+    """Random choices among a fixed number of options, drawn in blocks.
+
+    Drawing a single number from a Generator costs far more than reading
+    one from a list, so choices are drawn CHOICE_BLOCK_SIZE at a time and
+    handed out one by one. A stream has no lock, so it must only be read
+    from one thread, by the one AI it belongs to.
+
+    Attributes:
+        choiceCount: Choices are in range(choiceCount)
+        generator: The NumPy Generator choices are drawn from
+        blockSize: The number of choices drawn at once
+        block: The choices drawn and not handed out yet
+    """
+
+    __slots__ = ("__choiceCount", "__generator", "__blockSize", "__block")
+
+    def __init__(   self,
+                    choiceCount,
+                    generator   = None,
+                    blockSize   = CHOICE_BLOCK_SIZE):
+        if generator is None:
+            import numpy
+            generator = numpy.random.default_rng()
+        self.__choiceCount  = choiceCount
+        self.__generator    = generator
+        self.__blockSize    = blockSize
+        self.__block        = []
+
+    def next(self):
+        """ Get the next choice """
+        if not self.__block:
+            """ Reversed, so choices are handed out in the order drawn """
+            self.__block = self.__generator.integers(
+                                0, self.__choiceCount,
+                                self.__blockSize)[::-1].tolist()
+        return self.__block.pop()
@@ -10,19 +10,29 @@
 #       Food
 #       AISmart
 #       AIRandom
+#       AIPursuer
+#       AIHunter
 
 import threading
-from decisions import Stationary, KeyInput, AIRandomInput, AISmartInput
+from decisions import Stationary, KeyInput, AISmartInput
+from decisions import AIHunterInput
 from movements import Circle_
 from enums import InitialUserRadius, Color, Timeout
 
+## These decisions hold no state, so all AIs of a type share one. Random
+## AIs each need their own, since it holds their stream of turns
+STATIONARY      = Stationary()
+AI_SMART_INPUT  = AISmartInput()
+AI_HUNTER_INPUT = AIHunterInput()
+
 ###############################################################################
 ##
 ##                              Blob class
 ##
 ###############################################################################
 class Blob(object):
-    """A blob. Base class for all users.
+    """A blob. Base class for all users. Blobs (and every subclass) use 
+    slots instead of a dict per instance
 
     Attributes:
         id: The unique tag associated with each blob
@@ -32,6 +42,8 @@ class Blob(object):
         isDead: Event representing life of blob. Triggered on death.
     """
 
+    __slots__ = ("__id", "__color", "__decision", "__movement", "__isDead")
+
     def __init__(   self,
                     id_,
                     color,
@@ -54,6 +66,9 @@ class Blob(object):
     def getID(self):
         return self.__id
 
+    def getColor(self):
+        return self.__color
+
     def isDead(self):
         return self.__isDead
 
@@ -63,12 +78,30 @@ class Blob(object):
     def getRadius(self):
         return self.__movement.getRadius()
 
+    def getMovementInterval(self):
+        """ Timeout between moves """
+        return Timeout.MOVEMENT * (self.__movement.getRadius() / 3)
+
+    def getDecisionInterval(self):
+        """ Timeout between decisions (None if it never decides) """
+        return self.__decision.getDecisionInterval()
+
+    def isPassive(self):
+        """ Passive users have no threads. They never move or look for
+            collisions, and wait on the board to be eaten
+        """
+        return False
+
     #------------------------- END PAGE 1 --------------------------#
     ##########################   SETTERS   ##########################
 
     def setCenter(self, newCenter):
         self.__movement.setCenter(newCenter)
 
+    def setMovement(self, movementClass):
+        """ Swap the movement instance (eg. to attach it to a World) """
+        self.__movement = movementClass
+
     def increaseRadiusByN(self, radiusIncrease):
         self.__movement.increaseRadiusByN(radiusIncrease)
 
@@ -78,25 +111,50 @@ class Blob(object):
     def releasePosition(self):
         self.__movement.releasePosition()
     
-    def draw(self):
-        self.__movement.draw(self.__color)
+    def draw(self, circleCache = None, offset = (0, 0)):
+        self.__movement.draw(self.__color, circleCache, offset)
+
+    def move(self, game):
+        """ Make a single move based on movement class """
+        self.__movement.move(self, game)
+
+    def makeDecision(self, game):
+        """ Make a single decision based on decision class """
+        self.__decision.makeDecision(self, game)
+
+    def stopDeciding(self, game):
+        """ Let the decision class know that the user has died """
+        self.__decision.stopDeciding(self, game)
+
+    def leaveBoard(self, game):
+        """ Remove the user from its place on the board """
+        game.pullUserFromBoard(self.getCenter())
 
     def quit(self):
         """ Kill the users movement and decision threads """
         self.__isDead.set()
 
+    def startMoving(self, game):
+        """ Spin up a thread for moving """
+        movementThread = threading.Thread(
+                            target = self._moveAtInterval,
+                            args = [game])
+        movementThread.start()
+
     #########################   PROTECTED   #########################
 
-    def _getMovementInterval(self):
-        """ Timeout between moves """
-        return Timeout.MOVEMENT * (self.__movement.getRadius() / 3)
+    def _reset(self, id_, initialCenter, initialRadius):
+        """ Reuse a dead blob as if it was just created """
+        self.__id = id_
+        self.__movement.reset(initialCenter, initialRadius)
+        self.__isDead.clear()
 
     def _moveAtInterval(self, game):
         """ Move a food item based on movement class """
-        while not self.__isDead.wait(timeout=self._getMovementInterval()):
-            self.__movement.move(self, game)
+        while not self.__isDead.wait(timeout=self.getMovementInterval()):
+            self.move(game)
 
-        game.pullUserFromBoard(self.getCenter())
+        self.leaveBoard(game)
 
     def _waitForDecision(self, game):
         """ Change direction based on decision class """
@@ -119,12 +177,14 @@ class Human(Blob):
         isDead: Event representing life of human. Triggered when eaten.
     """
 
-    def __init__(self, initialCenter, decisionClass = KeyInput()):
-        """ Create a Human player """
+    __slots__ = ()
+
+    def __init__(self, initialCenter, decisionClass = None):
+        """ Create a Human player. Uses the keyboard by default """
         Blob.__init__(  self, 
                         id_             = "human",
                         color           = Color.RED,
-                        decisionClass   = decisionClass,
+                        decisionClass   = decisionClass or KeyInput(),
                         movementClass   = Circle_(
                                             initialCenter, 
                                             InitialUserRadius.HUMAN))
@@ -132,10 +192,7 @@ class Human(Blob):
     #------------------------- END PAGE 2 --------------------------#
     def start(self, game):
         """ Spin up a thread for moving """
-        movementThread = threading.Thread(
-                            target = self._moveAtInterval,
-                            args = [game])
-        movementThread.start()
+        self.startMoving(game)
 
         """ Pygame requires keyboard events to run in the main thread """
         self._waitForDecision(game)
@@ -157,6 +214,8 @@ class AI(Blob):
         isDead: Event representing life of AI. Triggered when eaten.
     """
 
+    __slots__ = ()
+
     def __init__(self, id_, initialCenter, AIDecision, AISize, AIColor):
         """ Create an AI Blob """
         Blob.__init__(  self, 
@@ -172,11 +231,8 @@ class AI(Blob):
         decisionThread = threading.Thread(
                             target = self._waitForDecision,
                             args = [game])
-        movementThread = threading.Thread(
-                            target = self._moveAtInterval,
-                            args = [game])
         decisionThread.start()
-        movementThread.start()
+        self.startMoving(game)
 
 
 ###############################################################################
@@ -185,7 +241,8 @@ class AI(Blob):
 ##
 ###############################################################################
 class Food(AI):
-    """A Food item.
+    """A Food item. Food is passive: it is only data on the board and
+    is eaten by whoever covers its center.
 
     Attributes:
         id: The unique tag associated with each food (food_{count})
@@ -195,16 +252,29 @@ class Food(AI):
         isDead: Event representing life of food. Triggered when eaten.
     """
 
+    __slots__ = ()
+
     #------------------------- END PAGE 3 --------------------------#
     def __init__(self, id_, initialCenter):
         """ Create an Food item """
         AI.__init__(    self, 
                         id_             = id_,
                         initialCenter   = initialCenter,
-                        AIDecision      = Stationary(),
+                        AIDecision      = STATIONARY,
                         AISize          = InitialUserRadius.FOOD,
                         AIColor         = Color.BLACK)
 
+    def isPassive(self):
+        return True
+
+    def reset(self, id_, initialCenter):
+        """ Reuse food that has been eaten """
+        self._reset(id_, initialCenter, InitialUserRadius.FOOD)
+
+    def start(self, game):
+        """ Food has no threads """
+        return
+
 
 ###############################################################################
 ##
@@ -222,12 +292,14 @@ class AISmart(AI):
         isDead: Event representing life of AI. Triggered when eaten.
     """
 
+    __slots__ = ()
+
     def __init__(self, id_, initialCenter):
         """ Create an AI that moves towards the human """
         AI.__init__(    self, 
                         id_             = id_,
                         initialCenter   = initialCenter,
-                        AIDecision      = AISmartInput(),
+                        AIDecision      = AI_SMART_INPUT,
                         AISize          = InitialUserRadius.AISMART,
                         AIColor         = Color.BLUE)
 
@@ -243,16 +315,78 @@ class AIRandom(AI):
     Attributes:
         id: The unique tag associated with each ai (random_ai_{count})
         color: Green
-        decision: AIRandomInput
+        decision: AIRandomInput with a stream of its own
         movement: Circle_
         isDead: Event representing life of AI. Triggered when eaten.
     """
 
-    def __init__(self, id_, initialCenter):
-        """ Create an AI that moves randomly """
+    __slots__ = ()
+
+    def __init__(self, id_, initialCenter, randomDecision):
+        """ Create an AI that moves randomly, with the turns of an
+            AIRandomInput that no other AI shares
+        """
         AI.__init__(    self, 
                         id_             = id_,
                         initialCenter   = initialCenter,
-                        AIDecision      = AIRandomInput(),
+                        AIDecision      = randomDecision,
                         AISize          = InitialUserRadius.AIRANDOM,
-                        AIColor         = Color.GREEN)
\ No newline at end of file
+                        AIColor         = Color.GREEN)
+
+
+###############################################################################
+##
+##                              Pursuer AI class
+##
+###############################################################################
+class AIPursuer(AI):
+    """A pursuing AI user. It chases the human like a smart AI, but finds
+    its way around larger blobs.
+
+    Attributes:
+        id: The unique tag associated with each ai (pursuer_ai_{count})
+        color: Orange
+        decision: AIPursuitInput, shared by every pursuer of a game
+        movement: Circle_
+        isDead: Event representing life of AI. Triggered when eaten.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, id_, initialCenter, pursuitDecision):
+        """ Create an AI that follows the flow field of pursuitDecision """
+        AI.__init__(    self, 
+                        id_             = id_,
+                        initialCenter   = initialCenter,
+                        AIDecision      = pursuitDecision,
+                        AISize          = InitialUserRadius.AISMART,
+                        AIColor         = Color.ORANGE)
+
+
+###############################################################################
+##
+##                              Hunter AI class
+##
+###############################################################################
+class AIHunter(AI):
+    """A hunting AI user. It chases the nearest smaller player and flees
+    from larger ones.
+
+    Attributes:
+        id: The unique tag associated with each ai (hunter_ai_{count})
+        color: Purple
+        decision: AIHunterInput
+        movement: Circle_
+        isDead: Event representing life of AI. Triggered when eaten.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, id_, initialCenter):
+        """ Create an AI that hunts smaller players """
+        AI.__init__(    self, 
+                        id_             = id_,
+                        initialCenter   = initialCenter,
+                        AIDecision      = AI_HUNTER_INPUT,
+                        AISize          = InitialUserRadius.AIHUNTER,
+                        AIColor         = Color.PURPLE)
@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+
+#   worlds.py
+#
+#   Sam Heilbron, Rachel Marison
+#   Last Updated: December 9, 2016
+#
+#   List of world classes:
+#       World
+
+import threading
+import numpy
+from enums import Direction, Timeout
+
+## Column and row change for one step in each direction
+DIRECTION_STEPS = numpy.zeros((6, 2), dtype = numpy.int32)
+DIRECTION_STEPS[Direction.LEFT]     = (-1, 0)
+DIRECTION_STEPS[Direction.RIGHT]    = (1, 0)
+DIRECTION_STEPS[Direction.UP]       = (0, -1)
+DIRECTION_STEPS[Direction.DOWN]     = (0, 1)
+
+## Above this many blobs, overlapping pairs are found with sort-and-sweep
+## instead of comparing every pair of blobs at once
+PAIRWISE_LIMIT = 256
+
+###############################################################################
+##
+##                              World class
+##
+###############################################################################
+class World(object):
+    """The state of every blob, stored as a structure of arrays.
+
+    Each blob owns a slot in a set of NumPy arrays. Movement classes that
+    are attached to a world read and write their slot directly, so no
+    lock is taken to read a position. Since all positions live side by
+    side, every blob can be moved in a single vectorised pass per tick.
+    The arrays may be given instead (e.g. in shared memory, see shards.py),
+    in which case the world never grows past its capacity. Every slot is
+    then searched on each pass, since another process may have filled it.
+
+    Attributes:
+        capacity: The number of slots in each array
+        canGrow: Whether the arrays are owned by the world and can grow
+        arrays: Map of name to each array the world was built on
+        x: Column of the center of each blob
+        y: Row of the center of each blob
+        radius: Radius of each blob
+        direction: Current direction of each blob
+        alive: Whether a slot is in use by a living blob
+        speed: Number of single pixel moves a blob makes per second
+        clock: Time accumulated towards the next move of each blob
+        users: The user that owns each slot
+        freeSlots: Slots that can be reused
+        highWater: One more than the highest slot ever used
+        mutex: Controls atomic allocation and release of slots
+    """
+
+    def __init__(self, capacity = 1024, arrays = None):
+        """ arrays: Map of attribute name to an array of capacity items,
+            for every array listed above (None to create them)
+        """
+        if arrays is None:
+            arrays = dict(
+                x           = numpy.zeros(capacity, dtype = numpy.int32),
+                y           = numpy.zeros(capacity, dtype = numpy.int32),
+                radius      = numpy.zeros(capacity, dtype = numpy.int32),
+                direction   = numpy.full(capacity, Direction.STAY,
+                                            dtype = numpy.int8),
+                alive       = numpy.zeros(capacity, dtype = bool),
+                speed       = numpy.zeros(capacity, dtype = numpy.float64),
+                clock       = numpy.zeros(capacity, dtype = numpy.float64))
+            self.__canGrow  = True
+        else:
+            self.__canGrow  = False
+
+        self.__capacity     = capacity
+        self.__arrays       = arrays
+        self.__x            = arrays["x"]
+        self.__y            = arrays["y"]
+        self.__radius       = arrays["radius"]
+        self.__direction    = arrays["direction"]
+        self.__alive        = arrays["alive"]
+        self.__speed        = arrays["speed"]
+        self.__clock        = arrays["clock"]
+        self.__users        = [None] * capacity
+        self.__mutex        = threading.Lock()
+        if self.__canGrow:
+            self.__freeSlots    = []
+            self.__highWater    = 0
+        else:
+            self.__freeSlots    = numpy.flatnonzero(
+                                    ~self.__alive)[::-1].tolist()
+            self.__highWater    = capacity
+
+    ##########################   GETTERS   ##########################
+
+    def getCenter(self, slot):
+        return (int(self.__x[slot]), int(self.__y[slot]))
+
+    def getRadius(self, slot):
+        return int(self.__radius[slot])
+
+    def getDirection(self, slot):
+        return int(self.__direction[slot])
+
+    def getUser(self, slot):
+        return self.__users[slot]
+
+    def getActiveSlots(self):
+        """ Slots of every living blob, in slot order """
+        return numpy.flatnonzero(self.__alive[:self.__highWater])
+
+    def getPositions(self):
+        """ Views of the x, y and radius arrays for the used slots """
+        n = self.__highWater
+        return self.__x[:n], self.__y[:n], self.__radius[:n]
+
+    def getAlive(self):
+        return self.__alive[:self.__highWater]
+
+    def __len__(self):
+        return int(numpy.count_nonzero(self.getAlive()))
+
+    ##########################   SETTERS   ##########################
+
+    def allocate(   self, 
+                    user, 
+                    center, 
+                    radius, 
+                    direction   = Direction.STAY, 
+                    extras      = None):
+        """ Claim a slot for a blob and return it. Returns None if every
+            slot is taken and the arrays can't grow
+            extras: Map of the name of a given array that the world 
+                doesn't use (e.g. kind in shards.py) to the value of the 
+                blob in it. Every value is written before the slot is
+                marked alive, so no other process sees the blob alive
+                with the values of the last one
+        """
+        with self.__mutex:
+            if self.__freeSlots:
+                slot = self.__freeSlots.pop()
+            else:
+                if self.__highWater == self.__capacity:
+                    if not self.__canGrow:
+                        return None
+                    self._grow(2 * self.__capacity)
+                slot = self.__highWater
+                self.__highWater += 1
+
+            (self.__x[slot], self.__y[slot]) = center
+            self.__direction[slot]  = direction
+            self.__clock[slot]      = 0
+            self.__users[slot]      = user
+            self.setRadius(slot, radius)
+            for (name, value) in (extras or dict()).items():
+                self.__arrays[name][slot] = value
+            self.__alive[slot]      = True
+        return slot
+
+    def release(self, slot):
+        """ Give a slot back once its blob has died """
+        with self.__mutex:
+            if not self.__alive[slot]:
+                return
+            self.__alive[slot]      = False
+            self.__users[slot]      = None
+            self.__freeSlots.append(slot)
+
+    def setCenter(self, slot, center):
+        (self.__x[slot], self.__y[slot]) = center
+
+    def setRadius(self, slot, radius):
+        self.__radius[slot] = radius
+        self.__speed[slot]  = 3. / (Timeout.MOVEMENT * max(radius, 1))
+
+    def increaseRadius(self, slot, radiusIncrease):
+        self.setRadius(slot, self.__radius[slot] + radiusIncrease)
+
+    def setDirection(self, slot, direction):
+        self.__direction[slot] = direction
+
+    def steerTowards(self, slots, center):
+        """ Turn every blob in slots towards a position, along the axis
+            it is furthest from it on, as Basic.turnTowards does for one
+            blob
+        """
+        (col, row) = center
+        colDifference = col - self.__x[slots]
+        rowDifference = row - self.__y[slots]
+        self.__direction[slots] = numpy.where(
+            numpy.abs(colDifference) > numpy.abs(rowDifference),
+            numpy.where(colDifference > 0, Direction.RIGHT, Direction.LEFT),
+            numpy.where(rowDifference > 0, Direction.DOWN, Direction.UP))
+
+    ##########################   MOVEMENT   #########################
+
+    def advance(self, seconds, width, height, active = None,
+                holdSeconds = None):
+        """ Move every living blob by the number of single pixel steps
+            it has earned in the given time. Blobs stop at the border
+            of a width x height board, as they do in Circle_. If active
+            is given, only the blobs set in it are moved. If holdSeconds
+            is given, a blob only moves once it has earned that many
+            seconds of movement, so it moves less often in longer jumps.
+
+            Returns the slots that moved and their previous x and y
+        """
+        n = self.__highWater
+        alive = self.__alive[:n]
+        if active is not None:
+            alive = alive & active[:n]
+        clock = self.__clock[:n]
+        clock[alive] += seconds
+
+        steps = numpy.floor(clock * self.__speed[:n]).astype(numpy.int32)
+        steps[~alive] = 0
+        if holdSeconds is not None:
+            """ Held blobs keep their clock for a longer jump later """
+            steps[clock < holdSeconds[:n]] = 0
+        clock[alive] -= steps[alive] / self.__speed[:n][alive]
+
+        direction = self.__direction[:n]
+        steps[direction == Direction.STAY] = 0
+        moving = numpy.flatnonzero(steps)
+        if not len(moving):
+            return moving, moving, moving
+
+        (x, y) = (self.__x[moving], self.__y[moving])
+        radius = self.__radius[moving]
+        delta = DIRECTION_STEPS[direction[moving]] * steps[moving, None]
+
+        newX = x + delta[:, 0]
+        newY = y + delta[:, 1]
+
+        """ Never move further towards a border than radius from it. A
+            blob that is already too close (after growing) stays put
+        """
+        newX = numpy.where(delta[:, 0] < 0,
+                    numpy.maximum(newX, numpy.minimum(x, radius)),
+                    numpy.minimum(newX, numpy.maximum(x, width - radius)))
+        newY = numpy.where(delta[:, 1] < 0,
+                    numpy.maximum(newY, numpy.minimum(y, radius)),
+                    numpy.minimum(newY, numpy.maximum(y, height - radius)))
+
+        moved = (newX != x) | (newY != y)
+        self.__x[moving] = newX
+        self.__y[moving] = newY
+        return moving[moved], x[moved], y[moved]
+
+    #########################   COLLISIONS   ########################
+
+    def findOverlaps(self, slots = None, paths = None):
+        """ Find every pair of living blobs where one covers the center 
+            of the other. Only the given slots are searched, if any.
+            paths: The (slots, oldCols, oldRows) of the blobs that moved,
+                as returned by advance. A blob that moved covers every
+                center along its path from the old center, so one that
+                jumped several pixels can't skip over another
+
+            Returns an (n, 2) array of slots with the lower slot first
+        """
+        if slots is None:
+            slots = self.getActiveSlots()
+        (startX, startY) = self._getPathStarts(slots, paths)
+        if len(slots) <= PAIRWISE_LIMIT:
+            pairs = self._findOverlapsPairwise(slots, startX, startY)
+        else:
+            pairs = self._findOverlapsSweep(slots, startX, startY)
+        return pairs[numpy.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def findCollisions(self, slots = None, paths = None):
+        """ Decide who eats who among overlapping blobs (in slots, if
+            given, and along paths, as in findOverlaps).
+
+            Pairs are settled from the largest blob down, the larger blob
+            winning (the lower slot on a tie), exactly as Circle_ does.
+            A blob that has been eaten takes no further part and a winner 
+            is as large as everything it ate for the pairs that follow.
+            The world itself is left untouched.
+
+            Returns a list of (eaterSlot, eatenSlot, radiusIncrease)
+        """
+        pairs = self.findOverlaps(slots, paths)
+        if not len(pairs):
+            return []
+
+        radius = self.__radius
+        larger = numpy.maximum(radius[pairs[:, 0]], radius[pairs[:, 1]])
+        order = numpy.lexsort((pairs[:, 1], pairs[:, 0], -larger))
+
+        radii = dict()
+        eaten = set()
+        collisions = []
+        for (first, second) in pairs[order].tolist():
+            if first in eaten or second in eaten:
+                continue
+            firstRadius = radii.get(first, int(radius[first]))
+            secondRadius = radii.get(second, int(radius[second]))
+
+            if firstRadius >= secondRadius:
+                (eater, victim, victimRadius) = (first, second, secondRadius)
+            else:
+                (eater, victim, victimRadius) = (second, first, firstRadius)
+
+            eaten.add(victim)
+            radii[eater] = radii.get(eater, int(radius[eater])) + victimRadius
+            collisions.append((eater, victim, victimRadius))
+        return collisions
+
+    #########################   PROTECTED   #########################
+
+    def _getPathStarts(self, slots, paths):
+        """ Get the column and row each blob in slots moved from (its
+            center, if it didn't move)
+        """
+        startX = self.__x[:self.__highWater].astype(numpy.int64)
+        startY = self.__y[:self.__highWater].astype(numpy.int64)
+        if paths is not None:
+            (moved, oldCols, oldRows) = paths
+            startX[moved] = oldCols
+            startY[moved] = oldRows
+        return startX[slots], startY[slots]
+
+    def _findOverlapsPairwise(self, slots, startX, startY):
+        """ Compare every pair of blobs at once """
+        x = self.__x[slots].astype(numpy.int64)
+        y = self.__y[slots].astype(numpy.int64)
+        radius = self.__radius[slots].astype(numpy.int64)
+
+        """ From the center of each blob to the path of every other """
+        toPath = self._toPath(x[None, :], y[None, :],
+                              numpy.minimum(startX, x)[:, None],
+                              numpy.maximum(startX, x)[:, None],
+                              numpy.minimum(startY, y)[:, None],
+                              numpy.maximum(startY, y)[:, None])
+        distance = numpy.minimum(toPath, toPath.T)
+        reach = numpy.maximum(radius[:, None], radius[None, :]) ** 2
+        (first, second) = numpy.nonzero(numpy.triu(distance < reach, 1))
+        return numpy.stack((slots[first], slots[second]), axis = 1)
+
+    def _findOverlapsSweep(self, slots, startX, startY):
+        """ Sort blobs by the left of their path and only compare a blob
+            with the ones that follow it within the largest radius of its
+            right
+        """
+        x = self.__x[slots].astype(numpy.int64)
+        lowX = numpy.minimum(startX, x)
+        order = numpy.argsort(lowX, kind = "stable")
+        (slots, lowX) = (slots[order], lowX[order])
+        x = x[order]
+        y = self.__y[slots].astype(numpy.int64)
+        radius = self.__radius[slots].astype(numpy.int64)
+        highX = numpy.maximum(startX[order], x)
+        (lowY, highY) = (numpy.minimum(startY[order], y), 
+                         numpy.maximum(startY[order], y))
+
+        reach = int(radius.max())
+        ends = numpy.searchsorted(lowX, highX + reach, side = "left")
+        starts = numpy.arange(len(slots))
+
+        pairs = [numpy.empty((0, 2), dtype = slots.dtype)]
+        offset = 1
+        candidates = starts[ends > starts + offset]
+        while len(candidates):
+            others = candidates + offset
+            distance = numpy.minimum(
+                self._toPath(x[others], y[others], lowX[candidates], 
+                             highX[candidates], lowY[candidates], 
+                             highY[candidates]),
+                self._toPath(x[candidates], y[candidates], lowX[others],
+                             highX[others], lowY[others], highY[others]))
+            overlap = distance < numpy.maximum(
+                                    radius[candidates], radius[others]) ** 2
+            first = slots[candidates[overlap]]
+            second = slots[others[overlap]]
+            pairs.append(numpy.stack((numpy.minimum(first, second),
+                                      numpy.maximum(first, second)), 
+                                     axis = 1))
+            offset += 1
+            candidates = candidates[ends[candidates] > candidates + offset]
+        return numpy.concatenate(pairs)
+
+    def _toPath(self, cols, rows, lowCols, highCols, lowRows, highRows):
+        """ Squared distance from each center to a path. Blobs only move
+            along one axis in a pass, so the closest point of a path is
+            found by clamping to its box
+        """
+        return (numpy.clip(cols, lowCols, highCols) - cols) ** 2 + \
+               (numpy.clip(rows, lowRows, highRows) - rows) ** 2
+
+    def _grow(self, capacity):
+        """ Resize every array. Must hold mutex """
+        extra = capacity - self.__capacity
+        self.__x            = numpy.concatenate(
+                                (self.__x, numpy.zeros(extra, numpy.int32)))
+        self.__y            = numpy.concatenate(
+                                (self.__y, numpy.zeros(extra, numpy.int32)))
+        self.__radius       = numpy.concatenate(
+                                (self.__radius,
+                                 numpy.zeros(extra, numpy.int32)))
+        self.__direction    = numpy.concatenate(
+                                (self.__direction,
+                                 numpy.full(extra, Direction.STAY,
+                                            dtype = numpy.int8)))
+        self.__alive        = numpy.concatenate(
+                                (self.__alive, numpy.zeros(extra, bool)))
+        self.__speed        = numpy.concatenate(
+                                (self.__speed,
+                                 numpy.zeros(extra, numpy.float64)))
+        self.__clock        = numpy.concatenate(
+                                (self.__clock,
+                                 numpy.zeros(extra, numpy.float64)))
+        self.__users.extend([None] * extra)
+        self.__capacity     = capacity